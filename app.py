@@ -1,18 +1,60 @@
+import functools
+
 import streamlit as st
 import pandas as pd
 import numpy as np
-import joblib
-import matplotlib.pyplot as plt
-import time
-from PIL import Image
-import requests
 from io import BytesIO
 
+import config
+import identity
+from assets import medical_image_bytes, theme_css
+from features import FEATURE_INDEX, FEATURE_LABELS, NUMERIC_RANGES, encode_record, options
+from history_store import EXPORT_FORMATS, get_history_store
+import instrumentation
+from instrumentation import incr, span, timed
+from model_registry import get_registry, warm_in_background
+from prediction_cache import get_prediction_cache
+from scoring import RISK_THRESHOLDS, assess_cached, what_if
+
 # -----------------------------
 # Page Config
 # -----------------------------
 st.set_page_config(page_title="❤️ HeartGuard - Heart Disease Predictor", layout="wide")
 
+# -----------------------------
+# Assessment form defaults
+# -----------------------------
+ASSESSMENT_DEFAULTS = {
+    "age": 45, "sex": "Male", "cp": "Typical Angina", "trestbps": 120, "chol": 200,
+    "fbs": "Yes", "restecg": "Normal", "thalach": 150, "exang": "Yes",
+    "oldpeak": 1.0, "slope": "Upsloping", "ca": 1, "thal": "Normal",
+}
+
+# -----------------------------
+# User identity
+# -----------------------------
+def resolve_user_id():
+    # History belongs to the signed-in account when Streamlit's login is used,
+    # otherwise to the id in this browser's signed cookie. Returns the id and a
+    # newly issued cookie value to store in the browser (or None)
+    if st.user.get("is_logged_in"):
+        return identity.account_user_id(st.user.get("iss"), st.user.get("sub")), None
+    if config.IDENTITY == "streamlit":
+        return None, None
+    user_id = identity.user_id_from_token(st.context.cookies.get(identity.COOKIE_NAME))
+    if user_id:
+        return user_id, None
+    return identity.issue_token()
+
+def set_identity_cookie(token):
+    # Streamlit has no server-side API for setting cookies, so the browser stores it
+    st.html(
+        f"<script>document.cookie = '{identity.COOKIE_NAME}={token}; path=/; "
+        f"max-age={identity.COOKIE_MAX_AGE_S}; SameSite=Strict' + "
+        "(location.protocol === 'https:' ? '; Secure' : '');</script>",
+        unsafe_allow_javascript=True,
+    )
+
 # -----------------------------
 # Session State Defaults
 # -----------------------------
@@ -20,124 +62,134 @@ if "logged_in" not in st.session_state:
     st.session_state.logged_in = False
 if "page" not in st.session_state:
     st.session_state.page = "Welcome"
-if "history" not in st.session_state:
-    st.session_state.history = []
+if "user_id" not in st.session_state:
+    st.session_state.user_id, st.session_state.identity_cookie = resolve_user_id()
+if st.session_state.identity_cookie:
+    set_identity_cookie(st.session_state.identity_cookie)
 if "dark_mode" not in st.session_state:
     st.session_state.dark_mode = False
+if "assessment_inputs" not in st.session_state:
+    st.session_state.assessment_inputs = dict(ASSESSMENT_DEFAULTS)
 
 # -----------------------------
 # UI Helpers
 # -----------------------------
 def inject_css(dark=False):
-    body_bg = "#0b1020" if dark else "#f9f9fb"
-    text_color = "#e5e7eb" if dark else "#111827"
-    card_bg = "#1f2937" if dark else "white"
-    card_shadow = "0 4px 30px rgba(0,0,0,0.45)" if dark else "0 4px 30px rgba(0,0,0,0.12)"
-    st.markdown(f"""
-        <style>
-        @import url('https://fonts.googleapis.com/css2?family=Roboto:wght@400;700&display=swap');
-        
-        html, body, [class*="css"] {{
-            background: {body_bg} !important;
-            color: {text_color} !important;
-            font-family: 'Roboto', sans-serif;
-        }}
-        .card {{
-            background: {card_bg};
-            border-radius: 16px;
-            padding: 16px 18px;
-            box-shadow: {card_shadow};
-        }}
-        @keyframes heartbeat {{
-            0%, 100% {{ transform: scale(1); }}
-            25%, 75% {{ transform: scale(1.1); }}
-            50% {{ transform: scale(1.05); }}
-        }}
-        .heartbeat {{
-            animation: heartbeat 2s infinite;
-        }}
-        .main-header {{
-            font-size: 4rem;
-            color: #ff4b4b;
-            text-align: center;
-            margin-bottom: 1.5rem;
-            font-weight: 900;
-            text-shadow: 3px 3px 6px rgba(0,0,0,0.2);
-        }}
-        .feature-box {{
-            background: linear-gradient(145deg, #f0faff 0%, #d0e7ff 100%);
-            padding: 2rem;
-            border-radius: 20px;
-            box-shadow: 0 12px 24px rgba(0,0,0,0.15);
-            margin: 15px;
-            text-align: center;
-            transition: transform 0.3s ease, box-shadow 0.3s ease;
-        }}
-        .feature-box:hover {{
-            transform: translateY(-8px);
-            box-shadow: 0 20px 30px rgba(0,0,0,0.2);
-        }}
-        .start-button {{
-            display: block;
-            width: 260px;
-            margin: 2rem auto;
-            background: linear-gradient(135deg, #ff4b4b 0%, #ff7373 100%);
-            color: #fff;
-            font-weight: 700;
-            padding: 1rem 0;
-            border-radius: 40px;
-            font-size: 1.3rem;
-            cursor: pointer;
-            border: none;
-            transition: all 0.3s ease;
-        }}
-        .start-button:hover {{
-            transform: translateY(-5px);
-            box-shadow: 0 10px 20px rgba(255,75,75,0.5);
-        }}
-        .emergency-card {{
-            background: linear-gradient(135deg, #ffe6e6 0%, #ffb3b3 100%);
-            padding: 1.5rem;
-            border-radius: 20px;
-            margin: 1rem 0;
-            box-shadow: 0 6px 12px rgba(0,0,0,0.1);
-        }}
-        .success-icon {{
-            font-size: 5rem;
-            text-align: center;
-            display: block;
-            margin: 1rem auto;
-            color: #4CAF50;
-        }}
-        </style>
-    """, unsafe_allow_html=True)
+    st.markdown(theme_css(dark), unsafe_allow_html=True)
 
 def set_matplotlib_theme(dark=False):
+    import matplotlib.pyplot as plt
     plt.style.use("dark_background" if dark else "default")
 
-# -----------------------------
-# Dummy model for demonstration
-# -----------------------------
-def create_dummy_model():
-    from sklearn.ensemble import RandomForestClassifier
-    np.random.seed(42)
-    X_dummy = np.random.rand(100, 13)
-    y_dummy = np.random.randint(0, 2, 100)
-    model = RandomForestClassifier()
-    model.fit(X_dummy, y_dummy)
-    return model
-
 # -----------------------------
 # Load medical image
 # -----------------------------
 def load_medical_image():
+    from PIL import Image
+    data = medical_image_bytes()
+    if data is None:
+        return None
     try:
-        url = "https://img.freepik.com/free-vector/heart-care-medical-background_53876-95157.jpg"
-        img = Image.open(BytesIO(requests.get(url).content))
-        return img
-    except:
+        return Image.open(BytesIO(data))
+    except OSError:
         return None
 
+# -----------------------------
+# History export
+# -----------------------------
+def history_export(user_id, fmt):
+    # Deferred download: Streamlit calls this only when the button is clicked
+    def build():
+        buffer = BytesIO()
+        with span("history_export", format=fmt):
+            get_history_store().write_export(user_id, buffer, fmt)
+        buffer.seek(0)
+        return buffer
+    return build
+
+# -----------------------------
+# What-if analysis
+# -----------------------------
+WHAT_IF_POINTS = {1: 100, 2: 25}  # grid points per axis for 1-D / 2-D sweeps
+
+def sweep_values(feature, n_points):
+    lo, hi = NUMERIC_RANGES[feature]
+    values = np.linspace(lo, hi, n_points)
+    return np.unique(values.round()) if isinstance(lo, int) else values.round(2)
+
+def render_what_if(prediction):
+    import altair as alt
+
+    swept = st.multiselect(
+        "Vary up to two inputs", list(NUMERIC_RANGES), default=["chol"], max_selections=2,
+        format_func=FEATURE_LABELS.get, key="what_if_features"
+    )
+    if not swept:
+        st.info("Choose an input to see how the risk changes across its range.")
+        return
+
+    axes = [(name, sweep_values(name, WHAT_IF_POINTS[len(swept)])) for name in swept]
+    with span("what_if", axes=len(axes)):
+        probabilities = what_if(get_registry().get(), prediction["encoded"], axes)
+
+    current = {name: prediction["encoded"][FEATURE_INDEX[name]] for name in swept}
+    tier_scale = alt.Scale(type="threshold", domain=list(RISK_THRESHOLDS), range=["green", "orange", "red"])
+    if len(axes) == 1:
+        (name, values), = axes
+        label = FEATURE_LABELS[name]
+        data = pd.DataFrame({label: values, "Risk": probabilities})
+        curve = alt.Chart(data).mark_line().encode(
+            x=alt.X(label, type="quantitative"), y=alt.Y("Risk", type="quantitative", scale=alt.Scale(domain=[0, 1]),
+                                                          axis=alt.Axis(format="%")))
+        bounds = alt.Chart(pd.DataFrame({"Risk": list(RISK_THRESHOLDS)})).mark_rule(strokeDash=[4, 4]).encode(
+            y="Risk:Q", color=alt.Color("Risk:Q", scale=tier_scale, legend=None))
+        marker = alt.Chart(pd.DataFrame({label: [current[name]], "Risk": [prediction["probability"]]})).mark_point(
+            size=120, filled=True, color="black").encode(x=f"{label}:Q", y="Risk:Q")
+        st.altair_chart(curve + bounds + marker, use_container_width=True)
+    else:
+        (x_name, x_values), (y_name, y_values) = axes
+        x_label, y_label = FEATURE_LABELS[x_name], FEATURE_LABELS[y_name]
+        xx, yy = np.meshgrid(x_values, y_values, indexing="ij")
+        data = pd.DataFrame({x_label: xx.ravel(), y_label: yy.ravel(), "Risk": probabilities.ravel()})
+        heatmap = alt.Chart(data).mark_rect().encode(
+            x=alt.X(x_label, type="ordinal", axis=alt.Axis(format=".4~g")),
+            y=alt.Y(y_label, type="ordinal", sort="descending", axis=alt.Axis(format=".4~g")),
+            color=alt.Color("Risk", type="quantitative", scale=tier_scale, title="Risk tier"),
+            tooltip=[x_label, y_label, alt.Tooltip("Risk", format=".1%")])
+        st.altair_chart(heatmap, use_container_width=True)
+        st.caption(f"Your current values: {x_label} {current[x_name]:g}, {y_label} {current[y_name]:g}")
+    st.caption(f"{probabilities.size} scenarios scored in one batch. Tier boundaries at "
+               f"{RISK_THRESHOLDS[0]:.0%} and {RISK_THRESHOLDS[1]:.0%}.")
+
+# -----------------------------
+# Admin debug panel
+# -----------------------------
+# A timed fragment, so the panel keeps up with section fragments' reruns,
+# which never reach the bottom of the script where it is placed
+@st.fragment(run_every=config.ADMIN_PANEL_REFRESH_S)
+def render_admin_panel():
+    with st.expander("🛠️ Debug metrics"):
+        registry = get_registry()
+        st.write(f"**Model:** {registry.source} (version {registry.version}, engine {registry.engine})")
+        if registry.metadata:
+            st.json({k: registry.metadata.get(k) for k in ("version", "params", "metrics", "benchmark")},
+                    expanded=False)
+        st.write("**Prediction cache**", get_prediction_cache().stats())
+        if not instrumentation.enabled:
+            st.info("Set HEARTGUARD_METRICS_ENABLED=1 to collect timing spans and counters.")
+            return
+        spans = instrumentation.span_summary()
+        if spans:
+            st.dataframe(pd.DataFrame(
+                [{**labels, "Count": n, "Mean (ms)": mean_ms, "Total (s)": total}
+                 for labels, n, mean_ms, total in spans]), hide_index=True)
+        counters = instrumentation.counter_summary()
+        if counters:
+            st.dataframe(pd.DataFrame(
+                [{"Counter": name, **labels, "Value": value} for name, labels, value in counters]),
+                hide_index=True)
+        st.code(instrumentation.render_prometheus(), language="text")
+
 # -----------------------------
 # Diet plan and doctor functions
 # -----------------------------
@@ -179,6 +231,23 @@ def get_emergency_info():
         "While Waiting": "Sit down, try to stay calm, and take prescribed medication if available"
     }
 
+# Static tables are built once per process and shared read-only by every session
+@st.cache_resource
+def get_doctor_listings():
+    return pd.DataFrame({
+        "Name": ["Dr. Sarah Johnson", "Dr. Michael Chen", "Dr. Emily Williams"],
+        "Specialty": ["Preventive Cardiology", "Interventional Cardiology", "Heart Failure Specialist"],
+        "Hospital": ["City General Hospital", "University Medical Center", "Heart Institute"],
+        "Rating": ["4.8/5", "4.7/5", "4.9/5"]
+    })
+
+@st.cache_resource
+def get_emergency_contacts():
+    return pd.DataFrame({
+        "Service": ["Local Emergency", "National Heart Helpline", "Poison Control", "Local Hospital"],
+        "Phone Number": ["911", "1-800-HEART", "1-800-222-1222", "Check local listing"]
+    })
+
 # -----------------------------
 # Dark Mode Toggle (Top Right)
 # -----------------------------
@@ -191,6 +260,9 @@ inject_css(st.session_state.dark_mode)
 # Welcome Page
 # -----------------------------
 if st.session_state.page == "Welcome":
+    # Load the model while the user reads the welcome page
+    warm_in_background()
+
     st.markdown(f"""
         <div style="
             background: linear-gradient(135deg, #ff4b4b 0%, #ff7373 100%);
@@ -213,6 +285,10 @@ if st.session_state.page == "Welcome":
     st.write("- ✅ Professional tool for heart health monitoring")
 
     if st.button("🚀 Get Started", key="start_button"):
+        if st.session_state.user_id is None:
+            # HEARTGUARD_IDENTITY=streamlit: sign in first; the app reloads afterwards
+            st.login()
+            st.stop()
         st.session_state.logged_in = True
         st.session_state.page = "App"
         st.rerun()
@@ -220,87 +296,90 @@ if st.session_state.page == "Welcome":
     st.markdown("<div style='text-align:center; color: gray;'>© 2025 HeartGuard | Developed with ❤️ by Medical AI Team</div>", unsafe_allow_html=True)
 
 # -----------------------------
-# Main App with Tabs
+# Main App
 # -----------------------------
+# In "sections" navigation only the selected section runs, as a fragment whose
+# own widgets rerun just that section. The legacy tabs layout keeps full reruns
+# so a new assessment is reflected in every tab.
 elif st.session_state.logged_in:
-    tabs = st.tabs([
-        "❤️ Assessment",
-        "📊 Results",
-        "🍽️ Diet Plan",
-        "🏥 Doctor Info",
-        "🆘 Emergency",
-        "🗃️ History",
-        "🔑 Logout"
-    ])
-
-    # Load model
-    try:
-        model = create_dummy_model()
-    except Exception as e:
-        st.error(f"⚠️ Error loading model: {e}")
-        st.stop()
+    def section_fragment(fn):
+        if config.NAVIGATION == "tabs":
+            return fn
+
+        # Fragment reruns skip the end of the script, so each section publishes
+        # the metrics it just recorded itself
+        @functools.wraps(fn)
+        def render():
+            try:
+                fn()
+            finally:
+                instrumentation.publish()
+        return st.fragment(render)
 
     # -----------------------------
     # ASSESSMENT TAB
     # -----------------------------
-    with tabs[0]:
+    @section_fragment
+    @timed("render", tab="assessment")
+    def render_assessment():
+        # Load model
+        try:
+            registry = get_registry()
+            with span("model_acquisition"):
+                model = registry.get()
+        except Exception as e:
+            # span() has already counted the failure under errors{span="model_acquisition"}
+            st.error(f"⚠️ Error loading model: {e}")
+            st.stop()
+
         st.title("❤️ Heart Disease Risk Assessment")
-        col1, col2 = st.columns(2)
-        with col1:
-            age = st.number_input("Age", 18, 100, 45)
-            sex = st.selectbox("Sex", ["Male", "Female"])
-            cp = st.selectbox("Chest Pain Type", ["Typical Angina", "Atypical Angina", "Non-anginal Pain", "Asymptomatic"])
-            trestbps = st.number_input("Resting Blood Pressure (mm Hg)", 90, 200, 120)
-            chol = st.number_input("Serum Cholesterol (mg/dl)", 100, 600, 200)
-            fbs = st.selectbox("Fasting Blood Sugar > 120 mg/dl", ["Yes", "No"])
-            restecg = st.selectbox("Resting ECG Results", ["Normal", "ST-T Abnormality", "Left Ventricular Hypertrophy"])
-            
-        with col2:
-            thalach = st.number_input("Maximum Heart Rate Achieved", 60, 220, 150)
-            exang = st.selectbox("Exercise Induced Angina", ["Yes", "No"])
-            oldpeak = st.number_input("ST Depression Induced by Exercise", 0.0, 6.2, 1.0, step=0.1)
-            slope = st.selectbox("Slope of Peak Exercise ST Segment", ["Upsloping", "Flat", "Downsloping"])
-            ca = st.number_input("Number of Major Vessels Colored by Fluoroscopy", 0, 3, 1)
-            thal = st.selectbox("Thalassemia", ["Normal", "Fixed Defect", "Reversible Defect"])
+        # Inputs live in a form so editing a field doesn't rerun the script;
+        # values are committed together on submit and kept for the session
+        inputs = st.session_state.assessment_inputs
+        with st.form("assessment_form", border=False):
+            col1, col2 = st.columns(2)
+            with col1:
+                age = st.number_input("Age", *NUMERIC_RANGES["age"], inputs["age"])
+                sex = st.selectbox("Sex", options("sex"), index=options("sex").index(inputs["sex"]))
+                cp = st.selectbox("Chest Pain Type", options("cp"), index=options("cp").index(inputs["cp"]))
+                trestbps = st.number_input("Resting Blood Pressure (mm Hg)", *NUMERIC_RANGES["trestbps"], inputs["trestbps"])
+                chol = st.number_input("Serum Cholesterol (mg/dl)", *NUMERIC_RANGES["chol"], inputs["chol"])
+                fbs = st.selectbox("Fasting Blood Sugar > 120 mg/dl", options("fbs"),
+                                   index=options("fbs").index(inputs["fbs"]))
+                restecg = st.selectbox("Resting ECG Results", options("restecg"),
+                                       index=options("restecg").index(inputs["restecg"]))
+                
+            with col2:
+                thalach = st.number_input("Maximum Heart Rate Achieved", *NUMERIC_RANGES["thalach"], inputs["thalach"])
+                exang = st.selectbox("Exercise Induced Angina", options("exang"),
+                                     index=options("exang").index(inputs["exang"]))
+                oldpeak = st.number_input("ST Depression Induced by Exercise", *NUMERIC_RANGES["oldpeak"], inputs["oldpeak"], step=0.1)
+                slope = st.selectbox("Slope of Peak Exercise ST Segment", options("slope"),
+                                     index=options("slope").index(inputs["slope"]))
+                ca = st.number_input("Number of Major Vessels Colored by Fluoroscopy", *NUMERIC_RANGES["ca"], inputs["ca"])
+                thal = st.selectbox("Thalassemia", options("thal"), index=options("thal").index(inputs["thal"]))
             
-        # Convert inputs to model features
-        sex_val = 1 if sex == "Male" else 0
-        cp_map = {"Typical Angina": 0, "Atypical Angina": 1, "Non-anginal Pain": 2, "Asymptomatic": 3}
-        cp_val = cp_map[cp]
-        fbs_val = 1 if fbs == "Yes" else 0
-        restecg_map = {"Normal": 0, "ST-T Abnormality": 1, "Left Ventricular Hypertrophy": 2}
-        restecg_val = restecg_map[restecg]
-        exang_val = 1 if exang == "Yes" else 0
-        slope_map = {"Upsloping": 0, "Flat": 1, "Downsloping": 2}
-        slope_val = slope_map[slope]
-        thal_map = {"Normal": 1, "Fixed Defect": 2, "Reversible Defect": 3}
-        thal_val = thal_map[thal]
-        
-        # Create feature array
-        features = np.array([[age, sex_val, cp_val, trestbps, chol, fbs_val, restecg_val, 
-                             thalach, exang_val, oldpeak, slope_val, ca, thal_val]])
+            submitted = st.form_submit_button("Assess Risk 💓")
         
-        if st.button("Assess Risk 💓", key="assess_button"):
+        if submitted:
+            st.session_state.assessment_inputs = {
+                "age": age, "sex": sex, "cp": cp, "trestbps": trestbps, "chol": chol,
+                "fbs": fbs, "restecg": restecg, "thalach": thalach, "exang": exang,
+                "oldpeak": oldpeak, "slope": slope, "ca": ca, "thal": thal,
+            }
+            # Convert inputs to model features
+            with span("feature_encoding"):
+                features = encode_record(st.session_state.assessment_inputs)
+            
             with st.spinner("Analyzing your heart health..."):
-                time.sleep(2)  # Simulate processing time
-                
-                # Generate prediction (using dummy model for demonstration)
-                prediction = model.predict(features)[0]
-                probability = model.predict_proba(features)[0][1]
-                
-                # Determine risk level
-                if probability < 0.3:
-                    risk_level = "low"
-                    risk_text = "Low Risk"
-                    risk_color = "green"
-                elif probability < 0.6:
-                    risk_level = "medium"
-                    risk_text = "Medium Risk"
-                    risk_color = "orange"
-                else:
-                    risk_level = "high"
-                    risk_text = "High Risk"
-                    risk_color = "red"
+                # One forest pass gives the label, probability and risk tier;
+                # repeated inputs are answered from the shared prediction cache
+                result = assess_cached(model, registry.version, features, explain=True)
+                incr("assessments", risk_level=result["risk_level"])
+                probability = result["probability"]
+                risk_level = result["risk_level"]
+                risk_text = result["risk_text"]
+                risk_color = result["risk_color"]
                 
                 # Store results in session state
                 st.session_state.prediction = {
@@ -308,6 +387,10 @@ elif st.session_state.logged_in:
                     "risk_text": risk_text,
                     "risk_color": risk_color,
                     "probability": probability,
+                    "latency_ms": result["latency_ms"],
+                    "bias": result["bias"],
+                    "contributions": result["contributions"],
+                    "encoded": features[0].tolist(),
                     "features": {
                         "Age": age, "Sex": sex, "Chest Pain": cp, 
                         "Blood Pressure": trestbps, "Cholesterol": chol,
@@ -316,20 +399,26 @@ elif st.session_state.logged_in:
                 }
                 
                 # Add to history
-                st.session_state.history.append({
-                    "Date": pd.Timestamp.now().strftime("%Y-%m-%d %H:%M"),
-                    "Risk Level": risk_text,
-                    "Probability": f"{probability:.2%}",
-                    "Age": age,
-                    "Sex": sex
-                })
+                get_history_store().append(
+                    st.session_state.user_id, risk_level, risk_text, probability,
+                    age=age, sex=sex
+                )
                 
                 st.success("Assessment complete! Navigate to the Results tab to see your analysis.")
+                if result["latency_ms"] > config.LATENCY_BUDGET_MS:
+                    st.warning(f"Scoring took {result['latency_ms']:.0f} ms, over the "
+                               f"{config.LATENCY_BUDGET_MS:.0f} ms latency budget.")
+                else:
+                    source = "cache" if result["cached"] else "model"
+                    st.caption(f"⏱️ Scored in {result['latency_ms']:.1f} ms from {source} "
+                               f"(budget {config.LATENCY_BUDGET_MS:.0f} ms)")
 
     # -----------------------------
     # RESULTS TAB
     # -----------------------------
-    with tabs[1]:
+    @section_fragment
+    @timed("render", tab="results")
+    def render_results():
         st.title("📊 Assessment Results")
         
         if "prediction" in st.session_state:
@@ -342,14 +431,17 @@ elif st.session_state.logged_in:
                 </div>
             """, unsafe_allow_html=True)
             
-            # Display feature importance (simulated)
+            # Per-patient feature contributions from the forest's decision paths
             st.subheader("Key Factors in Your Assessment")
-            feature_importance_data = {
-                "Factor": ["Age", "Cholesterol", "Blood Pressure", "Max Heart Rate", "Chest Pain Type"],
-                "Importance": [0.25, 0.20, 0.18, 0.15, 0.12]
-            }
-            feature_importance_df = pd.DataFrame(feature_importance_data)
-            st.bar_chart(feature_importance_df.set_index("Factor"))
+            contributions = pd.Series(prediction["contributions"]).rename(FEATURE_LABELS)
+            contributions = contributions.reindex(contributions.abs().sort_values(ascending=False).index)
+            st.bar_chart(contributions.rename("Contribution"))
+            st.caption(f"Starting from an average risk of {prediction['bias']:.1%}, bars above zero "
+                       "raised your estimated risk and bars below zero lowered it.")
+            
+            # What-if sweep over one or two inputs, scored in a single batch
+            st.subheader("🔬 What-if Analysis")
+            render_what_if(prediction)
             
             # Recommendations based on risk level
             st.subheader("Recommendations")
@@ -379,7 +471,9 @@ elif st.session_state.logged_in:
     # -----------------------------
     # DIET PLAN TAB
     # -----------------------------
-    with tabs[2]:
+    @section_fragment
+    @timed("render", tab="diet_plan")
+    def render_diet_plan():
         st.title("🍽️ Personalized Diet Plan")
         
         if "prediction" in st.session_state:
@@ -406,7 +500,9 @@ elif st.session_state.logged_in:
     # -----------------------------
     # DOCTOR INFO TAB
     # -----------------------------
-    with tabs[3]:
+    @section_fragment
+    @timed("render", tab="doctor_info")
+    def render_doctor_info():
         st.title("🏥 Doctor Information")
         
         if "prediction" in st.session_state:
@@ -418,21 +514,16 @@ elif st.session_state.logged_in:
             
             # Simulated doctor listings
             st.subheader("Cardiologists Near You")
-            doctors_data = {
-                "Name": ["Dr. Sarah Johnson", "Dr. Michael Chen", "Dr. Emily Williams"],
-                "Specialty": ["Preventive Cardiology", "Interventional Cardiology", "Heart Failure Specialist"],
-                "Hospital": ["City General Hospital", "University Medical Center", "Heart Institute"],
-                "Rating": ["4.8/5", "4.7/5", "4.9/5"]
-            }
-            doctors_df = pd.DataFrame(doctors_data)
-            st.dataframe(doctors_df, use_container_width=True)
+            st.dataframe(get_doctor_listings(), use_container_width=True)
         else:
             st.info("Complete an assessment first to get doctor recommendations.")
 
     # -----------------------------
     # EMERGENCY TAB
     # -----------------------------
-    with tabs[4]:
+    @section_fragment
+    @timed("render", tab="emergency")
+    def render_emergency():
         st.title("🆘 Emergency Information")
         
         emergency_info = get_emergency_info()
@@ -448,41 +539,54 @@ elif st.session_state.logged_in:
                 st.write(value)
         
         st.subheader("Emergency Contacts")
-        contacts_data = {
-            "Service": ["Local Emergency", "National Heart Helpline", "Poison Control", "Local Hospital"],
-            "Phone Number": ["911", "1-800-HEART", "1-800-222-1222", "Check local listing"]
-        }
-        contacts_df = pd.DataFrame(contacts_data)
-        st.dataframe(contacts_df, use_container_width=True, hide_index=True)
+        st.dataframe(get_emergency_contacts(), use_container_width=True, hide_index=True)
 
     # -----------------------------
     # HISTORY TAB
     # -----------------------------
-    with tabs[5]:
+    @section_fragment
+    @timed("render", tab="history")
+    def render_history():
         st.title("🗃️ Assessment History")
         
-        if st.session_state.history:
-            df = pd.DataFrame(st.session_state.history)
-            st.dataframe(df, use_container_width=True)
+        store = get_history_store()
+        total = store.count(st.session_state.user_id)
+        if total:
+            page_size = config.HISTORY_PAGE_SIZE
+            n_pages = -(-total // page_size)
+            page = 1
+            if n_pages > 1:
+                page = st.number_input("Page", 1, n_pages, 1, key="history_page")
+            with span("history_page"):
+                df = store.page(st.session_state.user_id, page, page_size)
+            df["Probability"] = df["Probability"].map("{:.2%}".format)
+            st.dataframe(df, use_container_width=True, hide_index=True)
+            first = (page - 1) * page_size + 1
+            st.caption(f"Showing {first}–{first + len(df) - 1} of {total} assessments (newest first)")
             
             # Add some simple analytics
             st.subheader("Risk Trend Over Time")
-            if len(st.session_state.history) > 1:
-                risk_map = {"Low Risk": 1, "Medium Risk": 2, "High Risk": 3}
-                df["Risk Numeric"] = df["Risk Level"].map(risk_map)
-                st.line_chart(df.set_index("Date")["Risk Numeric"])
+            with span("history_trend"):
+                trend = store.risk_trend(st.session_state.user_id)
+            if len(trend) > 1:
+                st.line_chart(trend["Risk Numeric"])
             
-            # Export option
-            csv = df.to_csv(index=False).encode("utf-8")
-            st.download_button("📥 Download History CSV", data=csv, 
-                              file_name="heart_health_history.csv", mime="text/csv")
+            # Export option: the file is only built when the download is clicked,
+            # streamed from the database in chunks
+            export_label = st.radio("Export format", list(EXPORT_FORMATS), horizontal=True, key="export_format")
+            fmt, mime, ext = EXPORT_FORMATS[export_label]
+            st.download_button(f"📥 Download History {export_label}",
+                              data=history_export(st.session_state.user_id, fmt),
+                              file_name=f"heart_health_history.{ext}", mime=mime, on_click="ignore")
         else:
             st.info("No assessments yet. Complete an assessment to see your history here.")
 
     # -----------------------------
     # LOGOUT TAB
     # -----------------------------
-    with tabs[6]:
+    @section_fragment
+    @timed("render", tab="logout")
+    def render_logout():
         st.title("🔑 Logout")
         
         st.markdown("""
@@ -494,6 +598,41 @@ elif st.session_state.logged_in:
         """, unsafe_allow_html=True)
         
         if st.button("Confirm Logout"):
+            # History is kept for this browser or account's next visit
+            st.session_state.pop("prediction", None)
+            st.session_state.assessment_inputs = dict(ASSESSMENT_DEFAULTS)
             st.session_state.logged_in = False
             st.session_state.page = "Welcome"
-            st.rerun()
\ No newline at end of file
+            if st.user.get("is_logged_in"):
+                st.session_state.pop("user_id", None)
+                st.logout()
+            st.rerun()
+
+    # -----------------------------
+    # Navigation
+    # -----------------------------
+    sections = {
+        "❤️ Assessment": render_assessment,
+        "📊 Results": render_results,
+        "🍽️ Diet Plan": render_diet_plan,
+        "🏥 Doctor Info": render_doctor_info,
+        "🆘 Emergency": render_emergency,
+        "🗃️ History": render_history,
+        "🔑 Logout": render_logout,
+    }
+    if config.NAVIGATION == "tabs":
+        for tab, render in zip(st.tabs(list(sections)), sections.values()):
+            with tab:
+                render()
+    else:
+        section = st.radio("Section", list(sections), horizontal=True, key="section",
+                           label_visibility="collapsed")
+        sections[section]()
+
+# -----------------------------
+# Metrics
+# -----------------------------
+if config.ADMIN_PANEL:
+    with st.sidebar:
+        render_admin_panel()
+instrumentation.publish()
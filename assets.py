@@ -0,0 +1,232 @@
+import functools
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+import config
+
+# -----------------------------
+# Asset cache
+# -----------------------------
+# Remote assets are fetched at most once (with a timeout) into a
+# content-addressed cache: objects/<sha256> holds the bytes and index.json maps
+# each URL to its hash. When a fetch fails, the bundled copy in assets/ is used,
+# so the app also works fully offline.
+
+BUNDLED_DIR = os.path.join(config.BASE_DIR, "assets")
+
+MEDICAL_IMAGE_URL = "https://img.freepik.com/free-vector/heart-care-medical-background_53876-95157.jpg"
+FONTS_CSS_URL = "https://fonts.googleapis.com/css2?family=Roboto:wght@400;700&display=swap"
+
+BUNDLED = {
+    MEDICAL_IMAGE_URL: "heart-care.png",
+    FONTS_CSS_URL: "fonts.css",
+}
+
+
+class AssetCache:
+    def __init__(self, cache_dir=None, timeout=None, fetch_remote=None):
+        self.cache_dir = cache_dir or config.ASSET_CACHE_DIR
+        self.timeout = timeout if timeout is not None else config.ASSET_TIMEOUT
+        self.fetch_remote = config.ASSET_FETCH_REMOTE if fetch_remote is None else fetch_remote
+        self._lock = threading.Lock()
+        self._memory = {}
+        self._failed = set()
+        self._index = None
+
+    @property
+    def _index_path(self):
+        return os.path.join(self.cache_dir, "index.json")
+
+    def _object_path(self, digest):
+        return os.path.join(self.cache_dir, "objects", digest)
+
+    def _load_index(self):
+        if self._index is None:
+            try:
+                with open(self._index_path, encoding="utf-8") as f:
+                    self._index = json.load(f)
+            except (OSError, ValueError):
+                self._index = {}
+        return self._index
+
+    def _atomic_write(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def _read_cached(self, url):
+        digest = self._load_index().get(url)
+        if digest is None:
+            return None
+        try:
+            with open(self._object_path(digest), "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        # Content-addressed: a corrupted object is treated as missing.
+        return data if hashlib.sha256(data).hexdigest() == digest else None
+
+    def _fetch(self, url):
+        import requests
+        response = requests.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        data = response.content
+        digest = hashlib.sha256(data).hexdigest()
+        self._atomic_write(self._object_path(digest), data)
+        self._load_index()[url] = digest
+        self._atomic_write(self._index_path, json.dumps(self._index, indent=1).encode("utf-8"))
+        return data
+
+    def _bundled(self, url):
+        name = BUNDLED.get(url)
+        if name is None:
+            return None
+        with open(os.path.join(BUNDLED_DIR, name), "rb") as f:
+            return f.read()
+
+    def get(self, url):
+        """Bytes for ``url`` from memory, disk, the network (once) or the bundle."""
+        data = self._memory.get(url)
+        if data is not None:
+            return data
+        with self._lock:
+            data = self._memory.get(url)
+            if data is None:
+                data = self._read_cached(url)
+            if data is None and self.fetch_remote and url not in self._failed:
+                try:
+                    data = self._fetch(url)
+                except Exception:
+                    # Don't retry a failing host on every rerun.
+                    self._failed.add(url)
+            if data is None:
+                data = self._bundled(url)
+            if data is not None:
+                self._memory[url] = data
+            return data
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_asset_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = AssetCache()
+    return _cache
+
+
+def medical_image_bytes():
+    return get_asset_cache().get(MEDICAL_IMAGE_URL)
+
+
+# -----------------------------
+# Theme CSS
+# -----------------------------
+THEMES = {
+    False: {
+        "body_bg": "#f9f9fb",
+        "text_color": "#111827",
+        "card_bg": "white",
+        "card_shadow": "0 4px 30px rgba(0,0,0,0.12)",
+    },
+    True: {
+        "body_bg": "#0b1020",
+        "text_color": "#e5e7eb",
+        "card_bg": "#1f2937",
+        "card_shadow": "0 4px 30px rgba(0,0,0,0.45)",
+    },
+}
+
+CSS_TEMPLATE = """
+        <style>
+        {fonts_css}
+        html, body, [class*="css"] {{
+            background: {body_bg} !important;
+            color: {text_color} !important;
+            font-family: 'Roboto', 'Helvetica Neue', Arial, sans-serif;
+        }}
+        .card {{
+            background: {card_bg};
+            border-radius: 16px;
+            padding: 16px 18px;
+            box-shadow: {card_shadow};
+        }}
+        @keyframes heartbeat {{
+            0%, 100% {{ transform: scale(1); }}
+            25%, 75% {{ transform: scale(1.1); }}
+            50% {{ transform: scale(1.05); }}
+        }}
+        .heartbeat {{
+            animation: heartbeat 2s infinite;
+        }}
+        .main-header {{
+            font-size: 4rem;
+            color: #ff4b4b;
+            text-align: center;
+            margin-bottom: 1.5rem;
+            font-weight: 900;
+            text-shadow: 3px 3px 6px rgba(0,0,0,0.2);
+        }}
+        .feature-box {{
+            background: linear-gradient(145deg, #f0faff 0%, #d0e7ff 100%);
+            padding: 2rem;
+            border-radius: 20px;
+            box-shadow: 0 12px 24px rgba(0,0,0,0.15);
+            margin: 15px;
+            text-align: center;
+            transition: transform 0.3s ease, box-shadow 0.3s ease;
+        }}
+        .feature-box:hover {{
+            transform: translateY(-8px);
+            box-shadow: 0 20px 30px rgba(0,0,0,0.2);
+        }}
+        .start-button {{
+            display: block;
+            width: 260px;
+            margin: 2rem auto;
+            background: linear-gradient(135deg, #ff4b4b 0%, #ff7373 100%);
+            color: #fff;
+            font-weight: 700;
+            padding: 1rem 0;
+            border-radius: 40px;
+            font-size: 1.3rem;
+            cursor: pointer;
+            border: none;
+            transition: all 0.3s ease;
+        }}
+        .start-button:hover {{
+            transform: translateY(-5px);
+            box-shadow: 0 10px 20px rgba(255,75,75,0.5);
+        }}
+        .emergency-card {{
+            background: linear-gradient(135deg, #ffe6e6 0%, #ffb3b3 100%);
+            padding: 1.5rem;
+            border-radius: 20px;
+            margin: 1rem 0;
+            box-shadow: 0 6px 12px rgba(0,0,0,0.1);
+        }}
+        .success-icon {{
+            font-size: 5rem;
+            text-align: center;
+            display: block;
+            margin: 1rem auto;
+            color: #4CAF50;
+        }}
+        </style>
+    """
+
+
+@functools.lru_cache(maxsize=None)
+def theme_css(dark=False):
+    """The full <style> block for a theme, built once per process."""
+    fonts_css = (get_asset_cache().get(FONTS_CSS_URL) or b"").decode("utf-8")
+    return CSS_TEMPLATE.format(fonts_css=fonts_css, **THEMES[bool(dark)])
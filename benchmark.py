@@ -0,0 +1,253 @@
+"""Offline micro-benchmarks for the app's hot paths.
+
+    python benchmark.py                          # full suite, writes benchmark_results.json
+    python benchmark.py --quick --only inference
+    python benchmark.py --baseline baseline.json --tolerance 0.25
+
+The suite covers model acquisition (fitting the dummy forest and loading the
+artifact), feature encoding, predict/predict_proba on both inference engines
+at growing batch sizes, and history page/trend/export work. Each case reports
+p50/p99 latency, throughput in rows/s and the process's peak RSS during one
+call of that case, plus how far that peak rose above the RSS the call started
+from. The peak is the kernel's high-water mark (VmHWM), reset just before the
+call, so native allocations such as sklearn's tree buffers are included; it is
+only available on Linux. Results are saved as JSON. With ``--baseline``, the
+run exits non-zero when any case's p50 is more than ``--tolerance`` slower
+than in the baseline file.
+"""
+import argparse
+import ctypes
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import config
+from features import CATEGORICAL_MAPS, FEATURE_ORDER, NUMERIC_RANGES, encode_frame, encode_record
+from forest_engine import CompiledForest
+from history_store import HistoryStore
+from model_registry import ModelRegistry, create_dummy_model
+
+BATCH_SIZES = [1, 10, 100, 1_000, 10_000, 100_000, 1_000_000]
+FRAME_SIZES = [1_000, 100_000, 1_000_000]
+HISTORY_SIZES = [10, 1_000, 100_000]
+
+
+def _status_mb(field):
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) / 1024
+    raise ValueError(f"{field} missing from /proc/self/status")
+
+
+def _release_free_memory():
+    gc.collect()
+    try:
+        # Hand freed heap pages back to the OS (glibc) so the next case's
+        # starting RSS doesn't include the previous case's leftovers.
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+def peak_rss_mb(fn):
+    """``(peak RSS, rise over the starting RSS)`` in MB during one call of ``fn``.
+
+    Both are None where the kernel's peak-RSS counter can't be reset.
+    """
+    _release_free_memory()
+    try:
+        # Writing 5 to clear_refs resets VmHWM to the current RSS (Linux 4.0+).
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        start = _status_mb("VmRSS")
+    except (OSError, ValueError):
+        return None, None
+    fn()
+    peak = _status_mb("VmHWM")
+    return peak, peak - start
+
+
+def measure(name, fn, rows=1, min_time=0.5, min_iterations=5, max_iterations=1000):
+    """Call ``fn`` repeatedly and summarise its latency distribution."""
+    fn()  # warm-up
+    timings = []
+    deadline = time.perf_counter() + min_time
+    while len(timings) < max_iterations and (len(timings) < min_iterations or time.perf_counter() < deadline):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    timings = np.array(timings)
+    peak_mb, delta_mb = peak_rss_mb(fn)
+    p50 = float(np.percentile(timings, 50))
+    result = {
+        "name": name,
+        "rows": rows,
+        "iterations": len(timings),
+        "p50_ms": p50 * 1000.0,
+        "p99_ms": float(np.percentile(timings, 99)) * 1000.0,
+        "throughput_rows_s": rows / p50 if p50 > 0 else float("inf"),
+        "peak_rss_mb": peak_mb,
+        "rss_delta_mb": delta_mb,
+    }
+    print(f"{name:<45} {rows:>9} rows  p50 {result['p50_ms']:>10.3f} ms  p99 {result['p99_ms']:>10.3f} ms  "
+          f"{result['throughput_rows_s']:>14,.0f} rows/s  {_rss_text(peak_mb, delta_mb)}", flush=True)
+    return result
+
+
+def _rss_text(peak_mb, delta_mb):
+    if peak_mb is None:
+        return "rss n/a"
+    return f"rss {peak_mb:>8.1f} MB (+{delta_mb:.1f})"
+
+
+def synthetic_frame(n, seed=0):
+    """Random patients in the Assessment form's label space."""
+    rng = np.random.RandomState(seed)
+    data = {}
+    for col in FEATURE_ORDER:
+        if col in CATEGORICAL_MAPS:
+            labels = np.array(list(CATEGORICAL_MAPS[col]), dtype=object)
+            data[col] = labels[rng.randint(0, len(labels), n)]
+        else:
+            lo, hi = NUMERIC_RANGES[col]
+            values = rng.uniform(lo, hi, n)
+            data[col] = values.round(1) if isinstance(lo, float) else values.round().astype(int)
+    return pd.DataFrame(data)
+
+
+def bench_model_acquisition(args):
+    results = [measure("model/create_dummy_model", create_dummy_model, min_iterations=3)]
+    if os.path.exists(config.MODEL_PATH):
+        results.append(measure("model/load_artifact",
+                               lambda: ModelRegistry(config.MODEL_PATH, engine="sklearn").get(), min_iterations=3))
+        results.append(measure("model/load_artifact+compile",
+                               lambda: ModelRegistry(config.MODEL_PATH, engine="compiled").get(), min_iterations=3))
+        registry = ModelRegistry(config.MODEL_PATH)
+        registry.get()
+        results.append(measure("model/registry_get_warm", registry.get))
+    return results
+
+
+def bench_encoding(args):
+    record = synthetic_frame(1).iloc[0].to_dict()
+    results = [measure("encode/record", lambda: encode_record(record))]
+    for n in _sizes(FRAME_SIZES, args):
+        frame = synthetic_frame(n)
+        results.append(measure("encode/frame", lambda: encode_frame(frame), rows=n, min_iterations=3))
+    return results
+
+
+def bench_inference(args):
+    model = ModelRegistry(engine="sklearn").get()
+    engines = {"sklearn": model, "compiled": CompiledForest.from_sklearn(model)}
+    X_all = encode_frame(synthetic_frame(max(_sizes(BATCH_SIZES, args))))
+    results = []
+    for n in _sizes(BATCH_SIZES, args):
+        X = X_all[:n]
+        for engine, m in engines.items():
+            if engine == "sklearn":
+                results.append(measure(f"inference/{engine}/predict", lambda: m.predict(X), rows=n))
+            results.append(measure(f"inference/{engine}/predict_proba", lambda: m.predict_proba(X), rows=n))
+    return results
+
+
+def bench_history(args):
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in _sizes(HISTORY_SIZES, args):
+            store = HistoryStore(os.path.join(tmp, f"history_{n}.db"))
+            rng = np.random.RandomState(n)
+            probabilities = rng.rand(n)
+            days = pd.date_range("2020-01-01", periods=n, freq="h").strftime("%Y-%m-%d %H:%M:%S")
+            with store._connect() as conn:
+                conn.executemany(
+                    "INSERT INTO assessments (user_id, created_at, risk_level, risk_text, probability, age, sex) "
+                    "VALUES ('bench', ?, 'low', 'Low Risk', ?, 50, 'Male')",
+                    zip(days, probabilities.tolist()))
+            legacy = [{"Date": d[:16], "Risk Level": "Low Risk", "Probability": f"{p:.2%}", "Age": 50,
+                       "Sex": "Male"} for d, p in zip(days, probabilities)]
+
+            results.append(measure("history/legacy_dataframe+csv",
+                                   lambda: pd.DataFrame(legacy).to_csv(index=False).encode("utf-8"), rows=n))
+            results.append(measure("history/page", lambda: store.page("bench", 1), rows=n))
+            results.append(measure("history/risk_trend", lambda: store.risk_trend("bench"), rows=n))
+            results.append(measure("history/write_csv", lambda: _export_to_null(store), rows=n))
+    return results
+
+
+def _export_to_null(store):
+    with open(os.devnull, "wb") as f:
+        store.write_csv("bench", f)
+
+
+BENCHMARKS = {
+    "model": bench_model_acquisition,
+    "encoding": bench_encoding,
+    "inference": bench_inference,
+    "history": bench_history,
+}
+
+
+def _sizes(sizes, args):
+    return [n for n in sizes if n <= args.max_rows]
+
+
+def compare(results, baseline, tolerance):
+    """Cases whose p50 regressed by more than ``tolerance`` against ``baseline``."""
+    previous = {(r["name"], r["rows"]): r for r in baseline["results"]}
+    regressions = []
+    for r in results:
+        old = previous.get((r["name"], r["rows"]))
+        if old and r["p50_ms"] > old["p50_ms"] * (1 + tolerance):
+            regressions.append((r["name"], r["rows"], old["p50_ms"], r["p50_ms"]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the component micro-benchmarks.")
+    parser.add_argument("--only", choices=list(BENCHMARKS), action="append", help="run only these groups")
+    parser.add_argument("--quick", action="store_true", help="cap sizes at 10,000 rows")
+    parser.add_argument("--max-rows", type=int, default=None, help="largest batch/frame/history size to run")
+    parser.add_argument("--output", default="benchmark_results.json", help="where to save the results")
+    parser.add_argument("--baseline", help="results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed p50 slowdown vs. the baseline (default: 0.2 = 20%%)")
+    args = parser.parse_args(argv)
+    if args.max_rows is None:
+        args.max_rows = 10_000 if args.quick else max(BATCH_SIZES)
+
+    results = []
+    for group in args.only or list(BENCHMARKS):
+        results.extend(BENCHMARKS[group](args))
+
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nSaved {len(results)} results to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for name, rows, old, new in regressions:
+            print(f"REGRESSION {name} ({rows} rows): p50 {old:.3f} ms -> {new:.3f} ms", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.tolerance:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import os
+
+# -----------------------------
+# Runtime configuration
+# -----------------------------
+# Every setting can be overridden through a HEARTGUARD_* environment variable so
+# the Streamlit app and the headless tools share one source of truth.
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _env(name, default):
+    return os.environ.get(f"HEARTGUARD_{name}", default)
+
+
+MODEL_PATH = _env("MODEL_PATH", os.path.join(BASE_DIR, "heart_disease_model.pkl"))
+# Memory-map numpy arrays stored in the artifact ("r") or load them eagerly ("").
+MODEL_MMAP_MODE = _env("MODEL_MMAP_MODE", "r") or None
+# Time allowed for one interactive assessment; slower runs are flagged in the UI.
+LATENCY_BUDGET_MS = float(_env("LATENCY_BUDGET_MS", "250"))
+# Assessment results kept in the process-wide LRU cache (0 disables it) and
+# their lifetime in seconds (unset = until evicted or the model changes).
+PREDICTION_CACHE_SIZE = int(_env("PREDICTION_CACHE_SIZE", "4096"))
+PREDICTION_CACHE_TTL = float(_env("PREDICTION_CACHE_TTL", "0")) or None
+# Scoring service micro-batching: largest batch per predict_proba call and the
+# longest a request waits for others to join its batch.
+SERVICE_MAX_BATCH = int(_env("SERVICE_MAX_BATCH", "64"))
+SERVICE_MAX_WAIT_MS = float(_env("SERVICE_MAX_WAIT_MS", "5"))
+# Inference engine: "sklearn" uses the estimator as loaded, "compiled" flattens
+# the forest into packed arrays (see forest_engine.py) for low-latency scoring.
+INFERENCE_ENGINE = _env("INFERENCE_ENGINE", "sklearn")
+# SQLite database holding every user's assessment history.
+HISTORY_DB_PATH = _env("HISTORY_DB_PATH", os.path.join(BASE_DIR, "heartguard_history.db"))
+HISTORY_PAGE_SIZE = int(_env("HISTORY_PAGE_SIZE", "20"))
+# Most points drawn in the History tab's risk trend; longer histories are downsampled.
+HISTORY_TREND_POINTS = int(_env("HISTORY_TREND_POINTS", "500"))
+# Assessments older than this many days are deleted when the store opens and
+# then at most hourly as history is read or written (0 = keep).
+HISTORY_RETENTION_DAYS = int(_env("HISTORY_RETENTION_DAYS", "30"))
+# Who owns a history: "cookie" gives each browser a random id in a signed cookie;
+# "streamlit" requires Streamlit's built-in login (st.login, set up in
+# .streamlit/secrets.toml) and keys history by the signed-in account.
+IDENTITY = _env("IDENTITY", "cookie")
+# Key for signing identity cookies. When unset, one is generated on first use and
+# kept in IDENTITY_KEY_PATH so cookies stay valid across restarts.
+IDENTITY_SECRET = _env("IDENTITY_SECRET", "")
+IDENTITY_KEY_PATH = _env("IDENTITY_KEY_PATH", os.path.join(BASE_DIR, ".heartguard_identity_key"))
+# On-disk cache for remote images/fonts and the timeout for fetching them.
+ASSET_CACHE_DIR = _env("ASSET_CACHE_DIR", os.path.join(BASE_DIR, ".cache", "assets"))
+ASSET_TIMEOUT = float(_env("ASSET_TIMEOUT", "3"))
+# Set to 0 to never touch the network and use only the bundled assets.
+ASSET_FETCH_REMOTE = _env("ASSET_FETCH_REMOTE", "1") != "0"
+# Timing spans and counters (see instrumentation.py); off by default.
+METRICS_ENABLED = _env("METRICS_ENABLED", "0") == "1"
+# Serve Prometheus text on this local port (0 = no endpoint) and/or write it to
+# this file after every rerun (empty = no file).
+METRICS_PORT = int(_env("METRICS_PORT", "0"))
+METRICS_FILE = _env("METRICS_FILE", "")
+# Show the metrics/debug panel in the app's sidebar, refreshed this often (seconds).
+ADMIN_PANEL = _env("ADMIN_PANEL", "0") == "1"
+ADMIN_PANEL_REFRESH_S = float(_env("ADMIN_PANEL_REFRESH_S", "5"))
+# "sections" runs only the selected page of the app on each rerun; "tabs" keeps
+# the original st.tabs layout, which executes every tab on every rerun.
+NAVIGATION = _env("NAVIGATION", "sections")
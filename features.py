@@ -0,0 +1,131 @@
+import numpy as np
+import pandas as pd
+
+# -----------------------------
+# Model feature schema
+# -----------------------------
+# Column order the model was trained on; names follow the Assessment form.
+FEATURE_ORDER = [
+    "age", "sex", "cp", "trestbps", "chol", "fbs", "restecg",
+    "thalach", "exang", "oldpeak", "slope", "ca", "thal",
+]
+
+sex_map = {"Male": 1, "Female": 0}
+cp_map = {"Typical Angina": 0, "Atypical Angina": 1, "Non-anginal Pain": 2, "Asymptomatic": 3}
+yes_no_map = {"Yes": 1, "No": 0}
+restecg_map = {"Normal": 0, "ST-T Abnormality": 1, "Left Ventricular Hypertrophy": 2}
+slope_map = {"Upsloping": 0, "Flat": 1, "Downsloping": 2}
+thal_map = {"Normal": 1, "Fixed Defect": 2, "Reversible Defect": 3}
+
+CATEGORICAL_MAPS = {
+    "sex": sex_map,
+    "cp": cp_map,
+    "fbs": yes_no_map,
+    "restecg": restecg_map,
+    "exang": yes_no_map,
+    "slope": slope_map,
+    "thal": thal_map,
+}
+
+# (min, max) for numeric inputs; app.py uses these as the st.number_input bounds.
+NUMERIC_RANGES = {
+    "age": (18, 100),
+    "trestbps": (90, 200),
+    "chol": (100, 600),
+    "thalach": (60, 220),
+    "oldpeak": (0.0, 6.2),
+    "ca": (0, 3),
+}
+
+# Display names used for explanations.
+FEATURE_LABELS = {
+    "age": "Age",
+    "sex": "Sex",
+    "cp": "Chest Pain Type",
+    "trestbps": "Blood Pressure",
+    "chol": "Cholesterol",
+    "fbs": "Fasting Blood Sugar",
+    "restecg": "Resting ECG",
+    "thalach": "Max Heart Rate",
+    "exang": "Exercise Angina",
+    "oldpeak": "ST Depression",
+    "slope": "ST Slope",
+    "ca": "Major Vessels",
+    "thal": "Thalassemia",
+}
+
+FEATURE_INDEX = {name: j for j, name in enumerate(FEATURE_ORDER)}
+
+# Label -> code lookup arrays, built once so encoding is a category lookup
+# followed by a numpy take rather than a Python loop over rows.
+_LABELS = {col: list(mapping) for col, mapping in CATEGORICAL_MAPS.items()}
+_CODES = {col: np.array(list(mapping.values()), dtype=np.float32)
+          for col, mapping in CATEGORICAL_MAPS.items()}
+
+
+def options(col):
+    """Selectbox options for a categorical feature, in display order."""
+    return _LABELS[col]
+
+
+def _encode_categorical(col, values):
+    if pd.api.types.is_numeric_dtype(values):
+        # Already encoded (e.g. a cohort export); only check the codes.
+        encoded = values.to_numpy(dtype=np.float32)
+        bad = ~np.isin(encoded, _CODES[col])
+    else:
+        idx = pd.Categorical(values, categories=_LABELS[col]).codes
+        bad = idx < 0
+        encoded = _CODES[col].take(idx)
+    if bad.any():
+        sample = pd.unique(np.asarray(values)[bad])[:5]
+        raise ValueError(f"Unknown value(s) for '{col}': {list(sample)}")
+    return encoded
+
+
+def _check_range(col, values):
+    lo, hi = NUMERIC_RANGES[col]
+    bad = ~((values >= lo) & (values <= hi))  # also catches NaN
+    if bad.any():
+        raise ValueError(f"{int(bad.sum())} value(s) for '{col}' outside [{lo}, {hi}] "
+                         f"(first: {values[bad][0]})")
+
+
+def encode_frame(df, validate=True):
+    """Encode a DataFrame of form values into a C-contiguous float32 matrix.
+
+    Categorical columns may hold the form's labels ("Male", "Flat", ...) or the
+    already-encoded codes. Raises ValueError on missing columns, unknown labels
+    and, when ``validate`` is set, numeric values outside the form's bounds.
+    """
+    missing = [col for col in FEATURE_ORDER if col not in df.columns]
+    if missing:
+        raise ValueError(f"Missing feature columns: {', '.join(missing)}")
+
+    X = np.empty((len(df), len(FEATURE_ORDER)), dtype=np.float32)
+    for j, col in enumerate(FEATURE_ORDER):
+        if col in CATEGORICAL_MAPS:
+            X[:, j] = _encode_categorical(col, df[col])
+        else:
+            X[:, j] = df[col].to_numpy(dtype=np.float32)
+            if validate:
+                _check_range(col, X[:, j])
+    return X
+
+
+def encode_record(record, validate=True):
+    """Encode one patient (a mapping of form values) into a 1x13 float32 matrix."""
+    row = []
+    for col in FEATURE_ORDER:
+        value = record[col]
+        mapping = CATEGORICAL_MAPS.get(col)
+        if mapping is not None:
+            if value not in mapping:
+                raise ValueError(f"Unknown value for '{col}': {value!r}")
+            value = mapping[value]
+        elif validate:
+            lo, hi = NUMERIC_RANGES[col]
+            if not lo <= value <= hi:
+                raise ValueError(f"Value for '{col}' outside [{lo}, {hi}]: {value}")
+        row.append(value)
+    return np.array([row], dtype=np.float32)
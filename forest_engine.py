@@ -0,0 +1,180 @@
+import threading
+import weakref
+
+import numpy as np
+
+# -----------------------------
+# Compiled forest evaluator
+# -----------------------------
+# Flattens a fitted RandomForestClassifier into a handful of packed arrays and
+# walks all trees at once with numpy, avoiding sklearn's per-call validation and
+# per-tree dispatch. Probabilities are bit-for-bit identical to predict_proba:
+# leaf values are normalised exactly as DecisionTreeClassifier does, and the
+# per-tree results are summed in estimator order before dividing by the count.
+
+
+class CompiledForest:
+    # Rows traversed at once; bounds the (rows x trees) working arrays.
+    chunk_size = 16384
+
+    def __init__(self, feature, threshold, left, right, node_proba, roots, max_depth,
+                 classes, n_features):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.node_proba = node_proba
+        self.roots = roots
+        self.max_depth = max_depth
+        self.classes_ = classes
+        self.n_features_in_ = n_features
+
+    @classmethod
+    def from_sklearn(cls, forest):
+        if getattr(forest, "n_outputs_", 1) != 1:
+            raise ValueError("Only single-output forests can be compiled")
+        trees = [est.tree_ for est in forest.estimators_]
+        n_classes = int(forest.n_classes_)
+        offsets = np.cumsum([0] + [t.node_count for t in trees])
+
+        feature, threshold, left, right, node_proba = [], [], [], [], []
+        for tree, offset in zip(trees, offsets):
+            is_leaf = tree.children_left == -1
+            idx = np.arange(tree.node_count)
+            # Leaves point at themselves, so extra traversal steps are no-ops.
+            left.append(np.where(is_leaf, idx, tree.children_left) + offset)
+            right.append(np.where(is_leaf, idx, tree.children_right) + offset)
+            feature.append(np.where(is_leaf, 0, tree.feature))
+            threshold.append(np.where(is_leaf, 0.0, tree.threshold))
+
+            value = np.array(tree.value[:, 0, :n_classes], dtype=np.float64)
+            normalizer = value.sum(axis=1)[:, np.newaxis]
+            normalizer[normalizer == 0.0] = 1.0
+            value /= normalizer
+            node_proba.append(value)
+
+        return cls(
+            feature=np.concatenate(feature).astype(np.int32),
+            threshold=np.concatenate(threshold).astype(np.float64),
+            left=np.concatenate(left).astype(np.int32),
+            right=np.concatenate(right).astype(np.int32),
+            node_proba=np.ascontiguousarray(np.concatenate(node_proba)),
+            roots=offsets[:-1].astype(np.int32),
+            max_depth=max(int(t.max_depth) for t in trees),
+            classes=np.asarray(forest.classes_),
+            n_features=int(forest.n_features_in_),
+        )
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.feature, self.threshold, self.left,
+                                      self.right, self.node_proba, self.roots))
+
+    def _check_input(self, X):
+        # sklearn trees compare float32 inputs against float64 thresholds.
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(f"X has {X.shape[1]} features, but the model expects "
+                             f"{self.n_features_in_}")
+        return X
+
+    def apply(self, X):
+        """Global leaf index reached in every tree, shape (n_rows, n_trees)."""
+        X = self._check_input(X)
+        rows = np.arange(X.shape[0])[:, np.newaxis]
+        node = np.broadcast_to(self.roots, (X.shape[0], len(self.roots))).copy()
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+        return node
+
+    def _predict_proba_chunk(self, X):
+        leaf = self.node_proba[self.apply(X)]
+        # Sum trees strictly in order, matching sklearn's accumulation.
+        proba = np.add.accumulate(leaf, axis=1)[:, -1]
+        proba /= len(self.roots)
+        return proba
+
+    def predict_proba(self, X):
+        X = self._check_input(X)
+        if X.shape[0] <= self.chunk_size:
+            return self._predict_proba_chunk(X)
+        return np.concatenate([self._predict_proba_chunk(X[i:i + self.chunk_size])
+                               for i in range(0, X.shape[0], self.chunk_size)])
+
+    def predict(self, X):
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1))
+
+    def _contributions_chunk(self, X, class_index):
+        n_rows, n_features = X.shape
+        value = self.node_proba[:, class_index]
+        flat_rows = (np.arange(n_rows) * n_features)[:, np.newaxis]
+        rows = np.arange(n_rows)[:, np.newaxis]
+        node = np.broadcast_to(self.roots, (n_rows, len(self.roots))).copy()
+        contributions = np.zeros(n_rows * n_features)
+        for _ in range(self.max_depth):
+            feature = self.feature[node]
+            go_left = X[rows, feature] <= self.threshold[node]
+            child = np.where(go_left, self.left[node], self.right[node])
+            # Change in class probability along each edge, credited to the
+            # feature split on (zero once a tree has reached its leaf).
+            delta = value[child] - value[node]
+            contributions += np.bincount((flat_rows + feature).ravel(), weights=delta.ravel(),
+                                         minlength=n_rows * n_features)
+            node = child
+        return contributions.reshape(n_rows, n_features) / len(self.roots)
+
+    def contributions(self, X, class_index=1):
+        """Per-feature contributions to the class probability along each decision path.
+
+        Returns ``(bias, contributions)`` where ``bias`` is the forest's mean root
+        probability and ``contributions`` has shape (n_rows, n_features); each
+        row sums with the bias to that row's ``predict_proba`` value.
+        """
+        X = self._check_input(X)
+        bias = float(self.node_proba[self.roots, class_index].mean())
+        if X.shape[0] <= self.chunk_size:
+            return bias, self._contributions_chunk(X, class_index)
+        return bias, np.concatenate([self._contributions_chunk(X[i:i + self.chunk_size], class_index)
+                                     for i in range(0, X.shape[0], self.chunk_size)])
+
+
+_compiled = weakref.WeakKeyDictionary()
+_compiled_lock = threading.Lock()
+
+
+def compiled_forest(model):
+    """The CompiledForest for ``model``, compiling sklearn forests once per instance."""
+    if isinstance(model, CompiledForest):
+        return model
+    with _compiled_lock:
+        compiled = _compiled.get(model)
+        if compiled is None:
+            compiled = _compiled[model] = CompiledForest.from_sklearn(model)
+        return compiled
+
+
+def explain(model, X, class_index=1):
+    """``(bias, contributions)`` for a sklearn or compiled forest; see CompiledForest.contributions."""
+    return compiled_forest(model).contributions(X, class_index)
+
+
+def parity_sample(compiled, n_rows=512, seed=0):
+    """Random rows spanning every feature's split thresholds."""
+    rng = np.random.RandomState(seed)
+    X = np.zeros((n_rows, compiled.n_features_in_), dtype=np.float32)
+    is_split = compiled.left != np.arange(len(compiled.left))
+    for j in range(compiled.n_features_in_):
+        thresholds = compiled.threshold[is_split & (compiled.feature == j)]
+        if thresholds.size:
+            X[:, j] = rng.uniform(thresholds.min() - 1.0, thresholds.max() + 1.0, n_rows)
+    return X
+
+
+def check_parity(forest, compiled, X=None):
+    """True if the compiled forest reproduces ``forest.predict_proba`` exactly."""
+    if X is None:
+        X = parity_sample(compiled)
+    return np.array_equal(forest.predict_proba(X), compiled.predict_proba(X))
@@ -0,0 +1,193 @@
+import csv
+import io
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+import config
+
+# -----------------------------
+# Assessment history store
+# -----------------------------
+# One SQLite database (WAL mode, so readers never block the writer) shared by
+# every session in the process; each thread gets its own connection.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS assessments (
+    id          INTEGER PRIMARY KEY,
+    user_id     TEXT NOT NULL,
+    created_at  TEXT NOT NULL,
+    risk_level  TEXT NOT NULL,
+    risk_text   TEXT NOT NULL,
+    probability REAL NOT NULL,
+    age         INTEGER,
+    sex         TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_assessments_user_time ON assessments (user_id, created_at);
+"""
+
+# Columns as shown in the History tab and written to exports.
+DISPLAY_QUERY = """
+SELECT substr(created_at, 1, 16) AS "Date", risk_text AS "Risk Level",
+       probability AS "Probability", age AS "Age", sex AS "Sex"
+FROM assessments WHERE user_id = ?
+"""
+
+# label -> (format, mime type, file extension)
+EXPORT_FORMATS = {
+    "CSV": ("csv", "text/csv", "csv"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet", "parquet"),
+}
+
+
+def _export_schema():
+    import pyarrow as pa
+    return pa.schema([
+        ("Date", pa.string()),
+        ("Risk Level", pa.string()),
+        ("Probability", pa.float64()),
+        ("Age", pa.int64()),
+        ("Sex", pa.string()),
+    ])
+
+
+RISK_NUMERIC_SQL = "CASE risk_level WHEN 'low' THEN 1 WHEN 'medium' THEN 2 ELSE 3 END"
+
+
+class HistoryStore:
+    # Retention is enforced when the store opens and then at most this often.
+    purge_interval_s = 3600
+
+    def __init__(self, path=None, retention_days=None):
+        self.path = path or config.HISTORY_DB_PATH
+        self.retention_days = config.HISTORY_RETENTION_DAYS if retention_days is None else retention_days
+        self._local = threading.local()
+        self._purge_lock = threading.Lock()
+        self._next_purge = 0.0
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+        self._maybe_purge()
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def append(self, user_id, risk_level, risk_text, probability, age=None, sex=None, created_at=None):
+        created_at = created_at or pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S")
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO assessments (user_id, created_at, risk_level, risk_text, probability, age, sex) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (user_id, created_at, risk_level, risk_text, float(probability), age, sex),
+            )
+        self._maybe_purge()
+
+    def _maybe_purge(self):
+        if not self.retention_days:
+            return
+        now = time.monotonic()
+        with self._purge_lock:
+            if now < self._next_purge:
+                return
+            self._next_purge = now + self.purge_interval_s
+        self.purge_older_than(self.retention_days)
+
+    def purge_older_than(self, days):
+        """Delete assessments older than ``days`` days; returns the number removed."""
+        cutoff = (pd.Timestamp.now() - pd.Timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S")
+        with self._connect() as conn:
+            return conn.execute("DELETE FROM assessments WHERE created_at < ?", (cutoff,)).rowcount
+
+    def count(self, user_id):
+        self._maybe_purge()
+        return self._connect().execute(
+            "SELECT COUNT(*) FROM assessments WHERE user_id = ?", (user_id,)).fetchone()[0]
+
+    def page(self, user_id, page=1, page_size=None):
+        """One page of a user's history, newest first (page numbers start at 1)."""
+        page_size = page_size or config.HISTORY_PAGE_SIZE
+        return pd.read_sql_query(
+            DISPLAY_QUERY + " ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?",
+            self._connect(), params=(user_id, page_size, (page - 1) * page_size))
+
+    def risk_trend(self, user_id, max_points=None):
+        """Risk (1 = low .. 3 = high) and probability per assessment, oldest first.
+
+        Histories longer than ``max_points`` are downsampled in SQL into that
+        many equal-sized consecutive buckets, each averaged and dated by its
+        first assessment; shorter histories return one row per assessment.
+        """
+        max_points = max_points or config.HISTORY_TREND_POINTS
+        return pd.read_sql_query(
+            f"""
+            WITH ranked AS (
+                SELECT created_at, {RISK_NUMERIC_SQL} AS risk_numeric, probability,
+                       ROW_NUMBER() OVER (ORDER BY created_at, id) - 1 AS rn,
+                       COUNT(*) OVER () AS n
+                FROM assessments WHERE user_id = ?
+            )
+            SELECT MIN(created_at) AS "Date", AVG(risk_numeric) AS "Risk Numeric",
+                   AVG(probability) AS "Probability", COUNT(*) AS "Assessments"
+            FROM ranked GROUP BY (rn * ?) / n ORDER BY 1
+            """,
+            self._connect(), params=(user_id, max_points), index_col="Date")
+
+    def iter_rows(self, user_id, chunk_size=5000):
+        """Yield (column names, rows) chunks of a user's history, oldest first."""
+        cursor = self._connect().execute(DISPLAY_QUERY + " ORDER BY created_at, id", (user_id,))
+        columns = [d[0] for d in cursor.description]
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield columns, rows
+
+    def write_csv(self, user_id, fileobj):
+        """Stream a user's history as UTF-8 CSV into a binary file object."""
+        header_written = False
+        for columns, rows in self.iter_rows(user_id):
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            if not header_written:
+                writer.writerow(columns)
+                header_written = True
+            writer.writerows(rows)
+            fileobj.write(buffer.getvalue().encode("utf-8"))
+
+    def write_parquet(self, user_id, fileobj):
+        """Stream a user's history into a Parquet file, one row group per chunk."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        schema = _export_schema()
+        with pq.ParquetWriter(fileobj, schema) as writer:
+            for _, rows in self.iter_rows(user_id):
+                arrays = [pa.array(values, type=field.type) for values, field in zip(zip(*rows), schema)]
+                writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+
+    def write_export(self, user_id, fileobj, fmt="csv"):
+        if fmt == "parquet":
+            self.write_parquet(user_id, fileobj)
+        elif fmt == "csv":
+            self.write_csv(user_id, fileobj)
+        else:
+            raise ValueError(f"Unknown export format: {fmt}")
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_history_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = HistoryStore()
+    return _store
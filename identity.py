@@ -0,0 +1,84 @@
+import hashlib
+import hmac
+import os
+import secrets
+import tempfile
+import threading
+import uuid
+
+import config
+
+# -----------------------------
+# Stable user identity
+# -----------------------------
+# Assessment history is keyed by an id that outlives the browser session. When
+# Streamlit's built-in login is used the id is derived from the signed-in
+# account; otherwise the server issues a random id in a cookie signed with a
+# server-side key, so a browser can only present ids this server handed out.
+
+COOKIE_NAME = "heartguard_uid"
+COOKIE_MAX_AGE_S = 365 * 24 * 3600
+
+_key = None
+_key_lock = threading.Lock()
+
+
+def _load_or_create_key(path):
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        pass
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(secrets.token_bytes(32))
+        try:
+            # link() fails if another process created the key first; use theirs.
+            os.link(tmp, path)
+        except FileExistsError:
+            pass
+    finally:
+        os.unlink(tmp)
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def signing_key():
+    global _key
+    if _key is None:
+        with _key_lock:
+            if _key is None:
+                if config.IDENTITY_SECRET:
+                    _key = config.IDENTITY_SECRET.encode("utf-8")
+                else:
+                    _key = _load_or_create_key(config.IDENTITY_KEY_PATH)
+    return _key
+
+
+def _signature(user_id, key):
+    return hmac.new(key, user_id.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+def issue_token(key=None):
+    """A new random user id and the signed cookie value that carries it."""
+    user_id = uuid.uuid4().hex
+    return user_id, f"{user_id}.{_signature(user_id, key or signing_key())}"
+
+
+def user_id_from_token(token, key=None):
+    """The user id in a signed cookie value, or None if it was not issued here."""
+    if not isinstance(token, str):
+        return None
+    user_id, _, signature = token.partition(".")
+    if not user_id or not signature:
+        return None
+    if not hmac.compare_digest(signature, _signature(user_id, key or signing_key())):
+        return None
+    return user_id
+
+
+def account_user_id(issuer, subject):
+    """Stable id for an account signed in through Streamlit's OIDC login."""
+    return "acct-" + hashlib.sha256(f"{issuer}\n{subject}".encode("utf-8")).hexdigest()[:32]
@@ -0,0 +1,207 @@
+import bisect
+import contextlib
+import functools
+import os
+import tempfile
+import threading
+import time
+
+import config
+
+# -----------------------------
+# Process-wide metrics
+# -----------------------------
+# span() times a block into a histogram and incr() bumps a counter. Both are
+# aggregated across all sessions in the process and rendered in Prometheus
+# text format. When metrics are disabled, span() returns a shared no-op
+# context manager and incr() returns immediately.
+
+PREFIX = "heartguard"
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+enabled = config.METRICS_ENABLED
+_NOOP = contextlib.nullcontext()
+_lock = threading.Lock()
+_counters = {}
+_histograms = {}
+
+
+def _key(name, labels):
+    return (name, tuple(sorted(labels.items())))
+
+
+class _Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class _Span:
+    __slots__ = ("name", "key", "start")
+
+    def __init__(self, name, key):
+        self.name = name
+        self.key = key
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        observe(self.key, time.perf_counter() - self.start)
+        # Streamlit's rerun/stop signals are BaseExceptions, not errors.
+        if exc_type is not None and issubclass(exc_type, Exception):
+            incr("errors", span=self.name)
+        return False
+
+
+def span(name, **labels):
+    """Time a block: ``with span("inference"): ...``."""
+    if not enabled:
+        return _NOOP
+    return _Span(name, _key("span", dict(labels, span=name)))
+
+
+def timed(name, **labels):
+    """Decorator form of span(); returns the function unchanged when disabled."""
+    def decorator(fn):
+        if not enabled:
+            return fn
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name, **labels):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def observe(key, seconds):
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = _Histogram()
+        histogram.observe(seconds)
+
+
+def incr(name, amount=1, **labels):
+    if not enabled:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + amount
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels, extra=()):
+    items = list(labels) + list(extra)
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+
+def render_prometheus():
+    """All metrics in the Prometheus text exposition format."""
+    with _lock:
+        counters = sorted(_counters.items())
+        histograms = sorted((k, list(h.counts), h.sum, h.count) for k, h in _histograms.items())
+
+    lines = []
+    if histograms:
+        lines.append(f"# HELP {PREFIX}_span_seconds Time spent in instrumented code paths.")
+        lines.append(f"# TYPE {PREFIX}_span_seconds histogram")
+        for (_, labels), counts, total, count in histograms:
+            cumulative = 0
+            for bound, n in zip(BUCKETS + ("+Inf",), counts):
+                cumulative += n
+                lines.append(f"{PREFIX}_span_seconds_bucket{_format_labels(labels, [('le', bound)])} {cumulative}")
+            lines.append(f"{PREFIX}_span_seconds_sum{_format_labels(labels)} {total}")
+            lines.append(f"{PREFIX}_span_seconds_count{_format_labels(labels)} {count}")
+
+    seen = set()
+    for (name, labels), value in counters:
+        if name not in seen:
+            lines.append(f"# TYPE {PREFIX}_{name}_total counter")
+            seen.add(name)
+        lines.append(f"{PREFIX}_{name}_total{_format_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def span_summary():
+    """Rows of (labels, count, mean ms, total s) for display."""
+    with _lock:
+        items = sorted(_histograms.items())
+        return [(dict(labels), h.count, h.sum / h.count * 1000.0 if h.count else 0.0, h.sum)
+                for (_, labels), h in items]
+
+
+def counter_summary():
+    with _lock:
+        return [(name, dict(labels), value) for (name, labels), value in sorted(_counters.items())]
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+def write_textfile(path):
+    """Atomically write the metrics to ``path`` (node_exporter textfile style)."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".metrics-")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(render_prometheus())
+    os.replace(tmp, path)
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_http_server(port, host="127.0.0.1"):
+    """Serve GET /metrics on a local daemon thread (once per process)."""
+    global _server
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), Handler)
+            threading.Thread(target=_server.serve_forever, name="metrics-http", daemon=True).start()
+    return _server
+
+
+def publish():
+    """Expose the metrics as configured; cheap to call on every rerun."""
+    if not enabled:
+        return
+    if config.METRICS_PORT and _server is None:
+        start_http_server(config.METRICS_PORT)
+    if config.METRICS_FILE:
+        write_textfile(config.METRICS_FILE)
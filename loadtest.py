@@ -0,0 +1,411 @@
+"""Concurrent-session load test for app.py against a live Streamlit server.
+
+    python loadtest.py --levels 1 4 16 --sessions 5 --output before.json
+    python loadtest.py --levels 1 4 16 --sessions 5 --output after.json
+    python loadtest.py --compare before.json after.json
+
+For each concurrency level N the harness starts a fresh ``streamlit run app.py``
+server, warms it up with one session and then connects N concurrent clients
+that speak Streamlit's websocket protocol directly, without a browser. Each
+client runs Welcome -> Get Started -> fill the assessment form -> Assess Risk
+-> History -> Logout ``--sessions`` times, every journey on a new connection,
+and times each script rerun from request to ``script_finished``. All sessions
+share the one server process, so its model registry, prediction cache and
+script threads are loaded as in production. The server's RSS and CPU time are
+read from /proc while the level runs (Linux only).
+
+The report covers throughput, p50/p95/p99 rerun latency per page, the server's
+RSS and CPU time, and the load generator's own CPU time so a saturated client
+is visible. Failed sessions are excluded from the latency figures, the level is
+marked invalid, and the run exits non-zero. Assessment history goes to a
+throwaway SQLite file, and extra ``--env`` settings (e.g.
+``HEARTGUARD_INFERENCE_ENGINE=compiled``) apply to the server under test.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from collections import defaultdict
+
+import numpy as np
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+PAGES = ["welcome", "get_started", "assess", "history", "logout"]
+
+
+class ScriptError(RuntimeError):
+    pass
+
+
+class BrowserSession:
+    """One browser tab's worth of Streamlit protocol over a websocket.
+
+    Widgets are looked up by element type and label from the elements the server
+    sends. Like the frontend, the session resends every widget value it has set
+    on each rerun; button clicks are one-shot trigger values.
+    """
+
+    def __init__(self, ws):
+        self.ws = ws
+        self.page_script_hash = ""
+        self.widgets = {}
+        self.values = {}
+
+    async def rerun(self, triggers=(), fragment_id=""):
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        msg = BackMsg()
+        state = msg.rerun_script
+        state.page_script_hash = self.page_script_hash
+        state.fragment_id = fragment_id
+        state.widget_states.widgets.extend(list(self.values.values()) + list(triggers))
+        await self.ws.send_bytes(msg.SerializeToString())
+
+        errors = []
+        while True:
+            forward = ForwardMsg()
+            forward.ParseFromString(await self.ws.receive_bytes())
+            kind = forward.WhichOneof("type")
+            if kind == "new_session":
+                self.page_script_hash = forward.new_session.page_script_hash
+            elif kind == "delta" and forward.delta.WhichOneof("type") == "new_element":
+                self._record(forward.delta.new_element, forward.delta.fragment_id, errors)
+            elif kind == "script_finished":
+                # st.rerun() ends a run early and the server starts the next one itself.
+                if forward.script_finished == ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    continue
+                if forward.script_finished == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                    errors.append("script failed to compile")
+                if errors:
+                    raise ScriptError(errors[0])
+                return
+
+    def _record(self, element, fragment_id, errors):
+        kind = element.WhichOneof("type")
+        if kind == "exception":
+            errors.append(element.exception.message)
+            return
+        widget = getattr(element, kind)
+        if getattr(widget, "id", "") and hasattr(widget, "label"):
+            self.widgets[kind, widget.label] = (widget.id, fragment_id)
+
+    def _widget(self, kind, label):
+        try:
+            return self.widgets[kind, label]
+        except KeyError:
+            raise LookupError(f"No {kind} labelled {label!r}") from None
+
+    def set_value(self, kind, label, **value):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+        widget_id, _ = self._widget(kind, label)
+        self.values[widget_id] = WidgetState(id=widget_id, **value)
+
+    async def click(self, label):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+        widget_id, fragment_id = self._widget("button", label)
+        await self.rerun([WidgetState(id=widget_id, trigger_value=True)], fragment_id)
+
+
+async def simulate_session(http, url, rng, timeout):
+    """One user's journey on a new connection; returns ({page: seconds}, error or None)."""
+    timings = {}
+
+    async def step(page, action):
+        start = time.perf_counter()
+        await asyncio.wait_for(action(), timeout)
+        timings[page] = time.perf_counter() - start
+
+    try:
+        start = time.perf_counter()
+        async with http.ws_connect(url, protocols=("streamlit",), max_msg_size=0) as ws:
+            session = BrowserSession(ws)
+            await asyncio.wait_for(session.rerun(), timeout)
+            timings["welcome"] = time.perf_counter() - start
+            await step("get_started", lambda: session.click("🚀 Get Started"))
+
+            session.set_value("number_input", "Age", int_value=int(rng.randint(18, 101)))
+            session.set_value("number_input", "Serum Cholesterol (mg/dl)", int_value=int(rng.randint(100, 601)))
+            session.set_value("number_input", "Resting Blood Pressure (mm Hg)", int_value=int(rng.randint(90, 201)))
+            session.set_value("selectbox", "Chest Pain Type", string_value=str(rng.choice(
+                ["Typical Angina", "Atypical Angina", "Non-anginal Pain", "Asymptomatic"])))
+            await step("assess", lambda: session.click("Assess Risk 💓"))
+
+            # "sections" navigation has a radio; the legacy tabs layout renders everything.
+            navigate = ("radio", "Section") in session.widgets
+            if navigate:
+                session.set_value("radio", "Section", string_value="🗃️ History")
+            await step("history", session.rerun)
+            if ("download_button", "📥 Download History CSV") not in session.widgets:
+                raise ScriptError("History shows no assessments after Assess Risk")
+
+            if navigate:
+                session.set_value("radio", "Section", string_value="🔑 Logout")
+                await asyncio.wait_for(session.rerun(), timeout)
+            await step("logout", lambda: session.click("Confirm Logout"))
+    except Exception as e:
+        return timings, f"{type(e).__name__}: {e}"
+    return timings, None
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(env, log):
+    """Launch ``streamlit run app.py`` and wait until it is healthy; returns (process, port)."""
+    port = _free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", APP_PATH, "--server.headless=true",
+         f"--server.port={port}", "--server.address=127.0.0.1", "--server.fileWatcherType=none",
+         "--browser.gatherUsageStats=false"],
+        env={**os.environ, **env}, stdout=log, stderr=subprocess.STDOUT)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"streamlit exited with status {proc.returncode}")
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1).close()
+            return proc, port
+        except OSError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError("streamlit did not become healthy within 60 s")
+
+
+def stop_server(proc):
+    proc.terminate()
+    try:
+        proc.wait(10)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+
+
+def process_cpu_s(pid):
+    """User + system CPU seconds of ``pid`` (None where /proc is unavailable)."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def process_memory_mb(pid):
+    """``(current RSS, peak RSS)`` of ``pid`` in MB from /proc/<pid>/status."""
+    values = {}
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                if key in ("VmRSS", "VmHWM"):
+                    values[key] = int(rest.split()[0]) / 1024
+    except (OSError, ValueError):
+        pass
+    return values.get("VmRSS"), values.get("VmHWM")
+
+
+async def _sample_rss(pid, samples, interval=0.25):
+    while True:
+        rss, _ = process_memory_mb(pid)
+        if rss is not None:
+            samples.append(rss)
+        await asyncio.sleep(interval)
+
+
+async def _drive(port, concurrency, sessions, timeout, seed, pid):
+    import aiohttp
+
+    url = f"ws://127.0.0.1:{port}/_stcore/stream"
+    async with aiohttp.ClientSession() as http:
+        # Warm up imports, the model and caches outside the measurement.
+        _, error = await simulate_session(http, url, np.random.RandomState(seed), timeout)
+        if error:
+            raise RuntimeError(f"warm-up session failed: {error}")
+
+        async def user(index):
+            rng = np.random.RandomState(seed + index + 1)
+            return [await simulate_session(http, url, rng, timeout) for _ in range(sessions)]
+
+        rss_samples = []
+        sampler = asyncio.create_task(_sample_rss(pid, rss_samples))
+        cpu_start, client_cpu_start = process_cpu_s(pid), time.process_time()
+        wall_start = time.perf_counter()
+        users = await asyncio.gather(*(user(i) for i in range(concurrency)))
+        wall = time.perf_counter() - wall_start
+        cpu_end, client_cpu = process_cpu_s(pid), time.process_time() - client_cpu_start
+        sampler.cancel()
+    cpu = cpu_end - cpu_start if cpu_start is not None and cpu_end is not None else None
+    return users, wall, cpu, client_cpu, rss_samples
+
+
+def run_level(concurrency, sessions, timeout, env, seed, log):
+    """Run ``concurrency`` clients, ``sessions`` journeys each, against one fresh server."""
+    proc, port = start_server(env, log)
+    try:
+        users, wall, cpu, client_cpu, rss_samples = asyncio.run(
+            _drive(port, concurrency, sessions, timeout, seed, proc.pid))
+        rss, peak_rss = process_memory_mb(proc.pid)
+    finally:
+        stop_server(proc)
+
+    latencies = defaultdict(list)
+    errors = []
+    for journeys in users:
+        for timings, error in journeys:
+            if error:
+                # Partial journeys would skew the percentiles; only count them.
+                errors.append(error)
+                continue
+            for page, seconds in timings.items():
+                latencies[page].append(seconds)
+
+    completed = concurrency * sessions - len(errors)
+    reruns = sum(len(v) for v in latencies.values())
+    pages = {}
+    for page in PAGES:
+        values = np.array(latencies.get(page, [])) * 1000.0
+        if values.size:
+            pages[page] = {
+                "count": int(values.size),
+                "p50_ms": float(np.percentile(values, 50)),
+                "p95_ms": float(np.percentile(values, 95)),
+                "p99_ms": float(np.percentile(values, 99)),
+            }
+    return {
+        "concurrency": concurrency,
+        "sessions": concurrency * sessions,
+        "completed": completed,
+        "errors": len(errors),
+        "error_samples": errors[:5],
+        "valid": not errors,
+        "wall_s": wall,
+        "sessions_per_s": completed / wall,
+        "reruns_per_s": reruns / wall,
+        "cpu_s": cpu,
+        "cpu_util": cpu / wall if cpu is not None else None,
+        "client_cpu_s": client_cpu,
+        "rss_mb": rss,
+        "max_rss_mb": max(rss_samples) if rss_samples else None,
+        "peak_rss_mb": peak_rss,
+        "pages": pages,
+    }
+
+
+def _mb(value):
+    return f"{value:.0f} MB" if value is not None else "n/a"
+
+
+def print_level(result):
+    print(f"\n== {result['concurrency']} concurrent users: {result['sessions']} sessions, "
+          f"{result['errors']} errors, {result['sessions_per_s']:.2f} sessions/s, "
+          f"{result['reruns_per_s']:.1f} reruns/s")
+    if not result["valid"]:
+        print(f"   !! INVALID: {result['errors']} session(s) failed; figures for this level are unreliable")
+    if result["cpu_s"] is not None:
+        print(f"   server CPU {result['cpu_s']:.1f} s ({result['cpu_util']:.0%} of one core), "
+              f"load generator CPU {result['client_cpu_s']:.1f} s")
+    print(f"   server RSS {_mb(result['rss_mb'])} at the end, {_mb(result['max_rss_mb'])} max during the "
+          f"level, {_mb(result['peak_rss_mb'])} peak since start")
+    print(f"   {'page':<12} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for page, stats in result["pages"].items():
+        print(f"   {page:<12} {stats['count']:>6} {stats['p50_ms']:>9.1f} {stats['p95_ms']:>9.1f} "
+              f"{stats['p99_ms']:>9.1f}")
+    for error in result["error_samples"]:
+        print(f"   ! {error}")
+
+
+def _change(old, new):
+    return f"{(new - old) / old:+.1%}" if old else "n/a"
+
+
+def compare(base_path, new_path):
+    with open(base_path, encoding="utf-8") as f:
+        base = {r["concurrency"]: r for r in json.load(f)["levels"]}
+    with open(new_path, encoding="utf-8") as f:
+        new = {r["concurrency"]: r for r in json.load(f)["levels"]}
+
+    print(f"{base_path} -> {new_path}")
+    for level in sorted(set(base) & set(new)):
+        b, n = base[level], new[level]
+        print(f"\n== {level} concurrent users")
+        for name, run in (("base", b), ("new", n)):
+            if not run.get("valid", True):
+                print(f"   !! {name} run had {run['errors']} failed session(s) at this level")
+        for key, label in (("sessions_per_s", "sessions/s"), ("reruns_per_s", "reruns/s"),
+                           ("cpu_s", "server CPU s"), ("max_rss_mb", "server RSS MB")):
+            if b.get(key) is not None and n.get(key) is not None:
+                print(f"   {label:<14} {b[key]:>10.2f} -> {n[key]:>10.2f}  ({_change(b[key], n[key])})")
+        for page in PAGES:
+            if page in b["pages"] and page in n["pages"]:
+                bp, np_ = b["pages"][page]["p95_ms"], n["pages"][page]["p95_ms"]
+                print(f"   {page + ' p95 ms':<14} {bp:>10.1f} -> {np_:>10.1f}  ({_change(bp, np_)})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test a live app.py server with concurrent sessions.")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 2, 4, 8],
+                        help="concurrent users per run (default: 1 2 4 8)")
+    parser.add_argument("--sessions", type=int, default=3, help="journeys per user (default: 3)")
+    parser.add_argument("--timeout", type=float, default=60, help="per-rerun timeout in seconds")
+    parser.add_argument("--env", action="append", default=[], metavar="NAME=VALUE",
+                        help="environment for the server under test (repeatable)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="loadtest_results.json", help="where to save the results")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="compare two saved runs and exit")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            "HEARTGUARD_HISTORY_DB_PATH": os.path.join(tmp, "history.db"),
+            "HEARTGUARD_IDENTITY_KEY_PATH": os.path.join(tmp, "identity.key"),
+        }
+        env.update(item.split("=", 1) for item in args.env)
+
+        levels = []
+        with open(os.path.join(tmp, "server.log"), "wb") as log:
+            try:
+                for concurrency in args.levels:
+                    result = run_level(concurrency, args.sessions, args.timeout, env, args.seed, log)
+                    print_level(result)
+                    levels.append(result)
+            except RuntimeError:
+                log.flush()
+                with open(log.name, encoding="utf-8", errors="replace") as f:
+                    print(f.read()[-4000:], file=sys.stderr)
+                raise
+
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "env": {k: v for k, v in env.items() if not k.endswith("_PATH")},
+        "sessions_per_user": args.sessions,
+        "levels": levels,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nSaved results to {args.output}")
+
+    failed = [r["concurrency"] for r in levels if not r["valid"]]
+    if failed:
+        print(f"Sessions failed at concurrency {', '.join(map(str, failed))}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+import hashlib
+import os
+import threading
+import warnings
+
+import config
+
+# -----------------------------
+# Process-wide model registry
+# -----------------------------
+# Streamlit re-executes app.py on every rerun, but imported modules live for the
+# whole process, so the registry below is shared by every session.
+
+
+def create_dummy_model():
+    import numpy as np
+    from sklearn.ensemble import RandomForestClassifier
+    rng = np.random.RandomState(42)
+    X_dummy = rng.rand(100, 13)
+    y_dummy = rng.randint(0, 2, 100)
+    model = RandomForestClassifier(random_state=42)
+    model.fit(X_dummy, y_dummy)
+    return model
+
+
+def _file_digest(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ModelRegistry:
+    """Loads the model artifact once and hands out one shared, read-only instance.
+
+    The file's mtime and size are checked on every ``get()``; the artifact is only
+    re-hashed when they change, and only reloaded when the hash changes too. A
+    replacement that fails to load leaves the current model in service.
+    """
+
+    def __init__(self, path=None, mmap_mode=None, engine=None):
+        self.path = path or config.MODEL_PATH
+        self.mmap_mode = mmap_mode if mmap_mode is not None else config.MODEL_MMAP_MODE
+        self.engine = engine or config.INFERENCE_ENGINE
+        self._lock = threading.Lock()
+        self._model = None
+        self._stat = None
+        self._digest = None
+        self.version = None
+        self.source = None
+        self.metadata = None
+
+    def get(self):
+        stat = self._stat_artifact()
+        if self._model is not None and stat == self._stat:
+            return self._model
+        with self._lock:
+            if self._model is None or stat != self._stat:
+                self._refresh(stat)
+            return self._model
+
+    def _stat_artifact(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _refresh(self, stat):
+        if stat is None:
+            # Artifact missing: keep whatever is already loaded (e.g. during a
+            # redeploy) and only fall back to the demonstration model at startup.
+            if self._model is None:
+                self._model = self._prepare(create_dummy_model())
+                self._digest = None
+                self.version = "dummy"
+                self.source = "dummy"
+            self._stat = None
+            return
+
+        digest = _file_digest(self.path)
+        if digest != self._digest or self._model is None:
+            import joblib
+            try:
+                model = joblib.load(self.path, mmap_mode=self.mmap_mode)
+            except Exception as e:
+                if self._model is None:
+                    raise
+                # A partly copied or corrupt artifact: keep serving the loaded
+                # model, and record the stat so this file isn't retried on
+                # every get() (it is reloaded once it changes again).
+                warnings.warn(f"Cannot load {self.path} ({type(e).__name__}: {e}); "
+                              f"keeping model version {self.version}")
+                self._stat = stat
+                return
+            # Artifacts from train_model.py carry their training metadata.
+            self.metadata = getattr(model, "heartguard_metadata_", None)
+            self._model = self._prepare(model)
+            self._digest = digest
+            self.version = digest[:12]
+            self.source = self.path
+        self._stat = stat
+
+    def _prepare(self, model):
+        if self.engine != "compiled":
+            return model
+        from forest_engine import CompiledForest, check_parity
+        try:
+            compiled = CompiledForest.from_sklearn(model)
+        except (AttributeError, ValueError) as e:
+            warnings.warn(f"Cannot compile model ({e}); using the sklearn estimator")
+            return model
+        if not check_parity(model, compiled):
+            warnings.warn("Compiled forest does not match predict_proba; using the sklearn estimator")
+            return model
+        return compiled
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ModelRegistry()
+    return _registry
+
+
+def get_model():
+    return get_registry().get()
+
+
+_warm_thread = None
+
+
+def warm_in_background():
+    """Start loading the model on a daemon thread (once per process)."""
+    global _warm_thread
+    with _registry_lock:
+        if _warm_thread is not None:
+            return _warm_thread
+        _warm_thread = threading.Thread(target=_warm, name="model-warmup", daemon=True)
+    _warm_thread.start()
+    return _warm_thread
+
+
+def _warm():
+    try:
+        get_model()
+    except Exception as e:
+        # The main thread will retry and report the error when it needs the model.
+        warnings.warn(f"Background model load failed: {e}")
@@ -0,0 +1,93 @@
+import threading
+import time
+from collections import OrderedDict
+
+import config
+
+# -----------------------------
+# Process-wide prediction cache
+# -----------------------------
+
+
+class PredictionCache:
+    """Bounded LRU cache of assessment results with an optional TTL.
+
+    Keys combine the model version with the encoded feature vector, and the
+    whole cache is dropped as soon as a different model version is seen, so a
+    reloaded artifact never serves stale predictions.
+    """
+
+    def __init__(self, maxsize=4096, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._model_version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(model_version, features):
+        # float32 -> Python floats is exact, so equal inputs give equal keys.
+        return (model_version, tuple(features.ravel().tolist()))
+
+    def get(self, key):
+        with self._lock:
+            if key[0] != self._model_version:
+                self._reset(key[0])
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, stored_at = entry
+            if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            if key[0] != self._model_version:
+                self._reset(key[0])
+            self._data[key] = (value, time.monotonic())
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def _reset(self, model_version):
+        self._data.clear()
+        self._model_version = model_version
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_prediction_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = PredictionCache(config.PREDICTION_CACHE_SIZE, config.PREDICTION_CACHE_TTL)
+    return _cache
@@ -0,0 +1,94 @@
+import time
+
+import numpy as np
+
+from features import FEATURE_INDEX, FEATURE_ORDER
+from instrumentation import incr, span
+
+# -----------------------------
+# Risk tiers
+# -----------------------------
+# Probability cut-offs between low/medium and medium/high risk.
+RISK_THRESHOLDS = (0.3, 0.6)
+RISK_LEVELS = np.array(["low", "medium", "high"])
+RISK_TEXT = {"low": "Low Risk", "medium": "Medium Risk", "high": "High Risk"}
+RISK_COLOR = {"low": "green", "medium": "orange", "high": "red"}
+
+
+def risk_tiers(probabilities):
+    """Map positive-class probabilities to "low" / "medium" / "high"."""
+    return RISK_LEVELS[np.digitize(probabilities, RISK_THRESHOLDS)]
+
+
+def positive_proba(model, X):
+    return model.predict_proba(X)[:, 1]
+
+
+def assess(model, features, explain=False):
+    """Score one encoded patient with a single predict_proba call.
+
+    The predicted label, probability and risk tier are all derived from the
+    same probability row, and the inference time is returned in milliseconds.
+    With ``explain``, per-feature contributions from the forest's decision
+    paths are added as ``contributions`` (keyed by feature) and ``bias``.
+    """
+    start = time.perf_counter()
+    with span("inference"):
+        proba = model.predict_proba(features)[0]
+    elapsed_ms = (time.perf_counter() - start) * 1000.0
+
+    probability = float(proba[1])
+    risk_level = str(risk_tiers(probability))
+    result = {
+        "label": int(model.classes_[proba.argmax()]),
+        "probability": probability,
+        "risk_level": risk_level,
+        "risk_text": RISK_TEXT[risk_level],
+        "risk_color": RISK_COLOR[risk_level],
+        "latency_ms": elapsed_ms,
+    }
+    if explain:
+        with span("explanation"):
+            result.update(explain_features(model, features))
+    return result
+
+
+def explain_features(model, features):
+    from forest_engine import explain
+    bias, contributions = explain(model, features)
+    return {"bias": bias, "contributions": dict(zip(FEATURE_ORDER, contributions[0].tolist()))}
+
+
+def assess_cached(model, model_version, features, cache=None, explain=False):
+    """Like ``assess()``, but served from the prediction cache when possible."""
+    if cache is None:
+        from prediction_cache import get_prediction_cache
+        cache = get_prediction_cache()
+    start = time.perf_counter()
+    key = cache.make_key(model_version, features)
+    result = cache.get(key)
+    cached = result is not None and (not explain or "contributions" in result)
+    incr("prediction_cache_hits" if cached else "prediction_cache_misses")
+    if not cached:
+        result = assess(model, features, explain=explain)
+        cache.put(key, result)
+    return dict(result, cached=cached, latency_ms=(time.perf_counter() - start) * 1000.0)
+
+
+def sweep_grid(features, axes):
+    """Copies of one encoded patient with the ``axes`` features varied over a grid.
+
+    ``axes`` is a list of ``(feature name, values)``; returns the (n_points, 13)
+    matrix and the grid shape, one dimension per axis.
+    """
+    grids = np.meshgrid(*[np.asarray(values, dtype=np.float32) for _, values in axes], indexing="ij")
+    X = np.repeat(np.asarray(features, dtype=np.float32).reshape(1, -1), grids[0].size, axis=0)
+    for (name, _), grid in zip(axes, grids):
+        X[:, FEATURE_INDEX[name]] = grid.ravel()
+    return X, grids[0].shape
+
+
+def what_if(model, features, axes):
+    """Positive-class probability over a 1-D or 2-D sweep, in one predict_proba call."""
+    X, shape = sweep_grid(features, axes)
+    return positive_proba(model, X).reshape(shape)
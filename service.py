@@ -0,0 +1,176 @@
+"""Headless HTTP/JSON scoring service.
+
+    python service.py --host 127.0.0.1 --port 8080
+
+POST /score with one patient object, or ``{"patients": [...]}`` for several,
+using the Assessment form's field names and labels:
+
+    {"age": 54, "sex": "Male", "cp": "Asymptomatic", "trestbps": 130,
+     "chol": 246, "fbs": "No", "restecg": "Normal", "thalach": 150,
+     "exang": "Yes", "oldpeak": 1.0, "slope": "Flat", "ca": 1,
+     "thal": "Reversible Defect"}
+
+Concurrent requests are gathered into micro-batches so each batch costs one
+``predict_proba`` call. GET /healthz reports the model version and batch stats,
+and GET /metrics serves Prometheus text when HEARTGUARD_METRICS_ENABLED=1.
+"""
+import argparse
+import asyncio
+
+import numpy as np
+from aiohttp import web
+
+import config
+from features import encode_record
+from instrumentation import incr, render_prometheus, span
+from model_registry import get_registry
+from scoring import RISK_TEXT, risk_tiers
+
+
+class MicroBatcher:
+    """Collects queued rows and scores them together with one predict_proba call."""
+
+    def __init__(self, registry, max_batch=None, max_wait_ms=None):
+        self.registry = registry
+        self.max_batch = max_batch or config.SERVICE_MAX_BATCH
+        self.max_wait = (max_wait_ms if max_wait_ms is not None else config.SERVICE_MAX_WAIT_MS) / 1000.0
+        self._queue = asyncio.Queue()
+        self._task = None
+        self.batches = 0
+        self.rows = 0
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def score(self, X):
+        """Queue the rows of X and wait for their positive-class probabilities."""
+        loop = asyncio.get_running_loop()
+        futures = []
+        for row in X:
+            future = loop.create_future()
+            self._queue.put_nowait((row, future))
+            futures.append(future)
+        return await asyncio.gather(*futures)
+
+    async def _collect(self):
+        batch = [await self._queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.max_wait
+        while len(batch) < self.max_batch:
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            X = np.stack([row for row, _ in batch])
+            try:
+                # Run the forest off the event loop so requests keep queueing.
+                model = await loop.run_in_executor(None, self.registry.get)
+                with span("service_batch"):
+                    proba = await loop.run_in_executor(None, model.predict_proba, X)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.batches += 1
+            self.rows += len(batch)
+            incr("service_rows", len(batch))
+            for (_, future), p in zip(batch, proba[:, 1]):
+                if not future.done():
+                    future.set_result(float(p))
+
+
+def _result(probability):
+    risk_level = str(risk_tiers(probability))
+    return {"probability": probability, "risk_level": risk_level, "risk_text": RISK_TEXT[risk_level]}
+
+
+async def handle_score(request):
+    try:
+        payload = await request.json()
+    except ValueError:
+        raise web.HTTPBadRequest(text="Request body must be JSON")
+
+    if not isinstance(payload, dict):
+        raise web.HTTPBadRequest(text="Request body must be a JSON object")
+    single = "patients" not in payload
+    patients = [payload] if single else payload["patients"]
+    if not isinstance(patients, list) or not patients:
+        raise web.HTTPBadRequest(text="'patients' must be a non-empty list")
+    try:
+        X = np.concatenate([encode_record(p) for p in patients])
+    except KeyError as e:
+        raise web.HTTPBadRequest(text=f"Missing field: {e.args[0]}")
+    except (TypeError, ValueError) as e:
+        raise web.HTTPBadRequest(text=str(e))
+
+    probabilities = await request.app["batcher"].score(X)
+    results = [_result(p) for p in probabilities]
+    return web.json_response(results[0] if single else {"results": results})
+
+
+async def handle_health(request):
+    batcher = request.app["batcher"]
+    return web.json_response({
+        "status": "ok",
+        "model_version": batcher.registry.version,
+        "batches": batcher.batches,
+        "rows": batcher.rows,
+    })
+
+
+async def handle_metrics(request):
+    return web.Response(text=render_prometheus(), content_type="text/plain", charset="utf-8")
+
+
+def create_app(registry=None, max_batch=None, max_wait_ms=None):
+    registry = registry or get_registry()
+    registry.get()  # load the model before accepting traffic
+
+    async def on_startup(app):
+        app["batcher"] = MicroBatcher(registry, max_batch, max_wait_ms)
+        app["batcher"].start()
+
+    async def on_cleanup(app):
+        await app["batcher"].stop()
+
+    app = web.Application()
+    app.router.add_post("/score", handle_score)
+    app.router.add_get("/healthz", handle_health)
+    app.router.add_get("/metrics", handle_metrics)
+    app.on_startup.append(on_startup)
+    app.on_cleanup.append(on_cleanup)
+    return app
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the heart disease scoring service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--max-batch", type=int, default=None,
+                        help="rows per predict_proba call (default: HEARTGUARD_SERVICE_MAX_BATCH)")
+    parser.add_argument("--max-wait-ms", type=float, default=None,
+                        help="max time to wait for a batch to fill (default: HEARTGUARD_SERVICE_MAX_WAIT_MS)")
+    args = parser.parse_args(argv)
+    web.run_app(create_app(max_batch=args.max_batch, max_wait_ms=args.max_wait_ms),
+                host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
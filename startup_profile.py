@@ -0,0 +1,89 @@
+"""Report what each import costs when app.py starts.
+
+    python startup_profile.py            # modules app.py imports at startup
+    python startup_profile.py --deferred # plus those loaded lazily on demand
+    python startup_profile.py --top 30 --raw
+
+The module-level imports are read from app.py itself and imported in a fresh
+interpreter under ``python -X importtime``. The timings are then grouped by
+top-level package.
+"""
+import argparse
+import ast
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+
+# Imported lazily by the app and the model registry; only loaded when needed.
+DEFERRED_MODULES = ["joblib", "sklearn.ensemble", "matplotlib.pyplot", "PIL.Image", "requests", "pyarrow.parquet"]
+
+
+def startup_imports(path=APP_PATH):
+    """Modules imported at module level (not inside functions) by ``path``."""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            modules.append(node.module)
+    return list(dict.fromkeys(modules))
+
+
+def profile_imports(modules):
+    """Run ``-X importtime`` over ``modules``; returns [(module, self_us, cumulative_us)]."""
+    code = "; ".join(f"import {m}" for m in modules)
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          capture_output=True, text=True, cwd=os.path.dirname(APP_PATH))
+    if proc.returncode != 0:
+        sys.stderr.write(proc.stderr)
+        raise SystemExit(proc.returncode)
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def by_package(rows):
+    totals = defaultdict(lambda: [0, 0])
+    for name, self_us, _ in rows:
+        entry = totals[name.split(".")[0]]
+        entry[0] += self_us
+        entry[1] += 1
+    return sorted(((pkg, us, n) for pkg, (us, n) in totals.items()), key=lambda r: -r[1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profile app.py's import-time cost.")
+    parser.add_argument("--deferred", action="store_true", help="also import the lazily loaded modules")
+    parser.add_argument("--top", type=int, default=15, help="rows to show (default: 15)")
+    parser.add_argument("--raw", action="store_true", help="list individual modules instead of packages")
+    args = parser.parse_args(argv)
+
+    modules = startup_imports()
+    if args.deferred:
+        modules += DEFERRED_MODULES
+    rows = profile_imports(modules)
+    total_ms = sum(self_us for _, self_us, _ in rows) / 1000.0
+
+    print(f"Imports: {', '.join(modules)}")
+    print(f"Total import time: {total_ms:.1f} ms across {len(rows)} modules\n")
+    if args.raw:
+        print(f"{'module':<50} {'self ms':>9} {'cumul ms':>9}")
+        for name, self_us, cumulative_us in sorted(rows, key=lambda r: -r[2])[:args.top]:
+            print(f"{name:<50} {self_us / 1000:>9.1f} {cumulative_us / 1000:>9.1f}")
+    else:
+        print(f"{'package':<30} {'ms':>9} {'share':>7} {'modules':>8}")
+        for pkg, us, n in by_package(rows)[:args.top]:
+            print(f"{pkg:<30} {us / 1000:>9.1f} {us / 1000 / max(total_ms, 1e-9):>7.1%} {n:>8}")
+
+
+if __name__ == "__main__":
+    main()
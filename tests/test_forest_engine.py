@@ -0,0 +1,64 @@
+import os
+import warnings
+
+import joblib
+import numpy as np
+import pytest
+
+from forest_engine import CompiledForest, check_parity, parity_sample
+from model_registry import create_dummy_model
+
+ARTIFACT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                        "heart_disease_model.pkl")
+
+
+def _shipped_model():
+    if not os.path.exists(ARTIFACT):
+        pytest.skip("heart_disease_model.pkl is not present")
+    return joblib.load(ARTIFACT)
+
+
+@pytest.fixture(params=["shipped", "dummy"])
+def forest(request):
+    return _shipped_model() if request.param == "shipped" else create_dummy_model()
+
+
+def _sklearn(method, X):
+    # The shipped artifact was fitted on a DataFrame; scoring uses plain arrays.
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return method(X)
+
+
+def test_single_rows_match_predict_proba(forest):
+    compiled = CompiledForest.from_sklearn(forest)
+    X = parity_sample(compiled, n_rows=64, seed=1)
+    for row in X:
+        row = row.reshape(1, -1)
+        assert np.array_equal(compiled.predict_proba(row), _sklearn(forest.predict_proba, row))
+
+
+@pytest.mark.parametrize("n_rows", [2, 1000, CompiledForest.chunk_size + 7])
+def test_batches_match_predict_proba(forest, n_rows):
+    compiled = CompiledForest.from_sklearn(forest)
+    X = parity_sample(compiled, n_rows=n_rows, seed=2)
+    assert np.array_equal(compiled.predict_proba(X), _sklearn(forest.predict_proba, X))
+    assert np.array_equal(compiled.predict(X), _sklearn(forest.predict, X))
+
+
+def test_float64_input_matches_predict_proba(forest):
+    compiled = CompiledForest.from_sklearn(forest)
+    X = parity_sample(compiled, n_rows=256, seed=3).astype(np.float64)
+    assert np.array_equal(compiled.predict_proba(X), _sklearn(forest.predict_proba, X))
+
+
+def test_check_parity(forest):
+    assert check_parity(forest, CompiledForest.from_sklearn(forest))
+
+
+def test_contributions_sum_to_probability(forest):
+    compiled = CompiledForest.from_sklearn(forest)
+    X = parity_sample(compiled, n_rows=128, seed=4)
+    bias, contributions = compiled.contributions(X)
+    np.testing.assert_allclose(bias + contributions.sum(axis=1), compiled.predict_proba(X)[:, 1],
+                               atol=1e-9)
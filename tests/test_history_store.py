@@ -0,0 +1,103 @@
+import io
+
+import pandas as pd
+import pytest
+
+from history_store import HistoryStore
+
+LEVELS = ["low", "medium", "high"]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return HistoryStore(str(tmp_path / "history.db"), retention_days=0)
+
+
+def _fill(store, n, user_id="u", start="2026-01-01 08:00:00", freq="min"):
+    times = pd.date_range(start, periods=n, freq=freq).strftime("%Y-%m-%d %H:%M:%S")
+    for i, created_at in enumerate(times):
+        level = LEVELS[i % 3]
+        store.append(user_id, level, level.title() + " Risk", i / max(n, 1), age=40 + i % 50, sex="Male",
+                     created_at=created_at)
+
+
+def test_risk_trend_has_one_row_per_assessment_below_max_points(store):
+    # All on the same day: must not collapse into one daily point.
+    _fill(store, 6)
+    trend = store.risk_trend("u", max_points=10)
+    assert len(trend) == 6
+    assert trend["Assessments"].tolist() == [1] * 6
+    assert trend["Risk Numeric"].tolist() == [1, 2, 3, 1, 2, 3]
+    assert trend.index.is_monotonic_increasing
+
+
+def test_risk_trend_downsamples_into_equal_buckets(store):
+    _fill(store, 1000)
+    trend = store.risk_trend("u", max_points=100)
+    assert len(trend) == 100
+    assert trend["Assessments"].tolist() == [10] * 100
+    assert trend.index[0] == "2026-01-01 08:00:00"
+    assert trend["Probability"].iloc[0] == pytest.approx(sum(range(10)) / 10 / 1000)
+
+
+def test_risk_trend_is_per_user(store):
+    _fill(store, 3, user_id="a")
+    _fill(store, 5, user_id="b")
+    assert len(store.risk_trend("a")) == 3
+    assert store.risk_trend("nobody").empty
+
+
+def test_page_is_newest_first_with_offsets(store):
+    _fill(store, 45)
+    first, last = store.page("u", 1, 20), store.page("u", 3, 20)
+    assert len(first) == 20 and len(last) == 5
+    assert first["Date"].is_monotonic_decreasing
+    assert first["Date"].iloc[0] == "2026-01-01 08:44"
+    assert last["Date"].iloc[-1] == "2026-01-01 08:00"
+    pages = pd.concat([store.page("u", p, 20) for p in (1, 2, 3)])
+    assert pages["Date"].is_unique and len(pages) == 45
+    assert list(first.columns) == ["Date", "Risk Level", "Probability", "Age", "Sex"]
+
+
+def test_page_breaks_timestamp_ties_by_insertion_order(store):
+    for level in LEVELS:
+        store.append("u", level, level, 0.5, created_at="2026-01-01 08:00:00")
+    assert store.page("u")["Risk Level"].tolist() == ["high", "medium", "low"]
+
+
+def test_csv_export_streams_every_row_oldest_first(store):
+    _fill(store, 12_000)  # more than one fetchmany() chunk
+    buffer = io.BytesIO()
+    store.write_export("u", buffer, "csv")
+    df = pd.read_csv(io.BytesIO(buffer.getvalue()))
+    assert len(df) == 12_000
+    assert list(df.columns) == ["Date", "Risk Level", "Probability", "Age", "Sex"]
+    assert df["Date"].is_monotonic_increasing
+
+
+def test_parquet_export_keeps_probability_as_float64(store):
+    pytest.importorskip("pyarrow")
+    _fill(store, 12_000)
+    buffer = io.BytesIO()
+    store.write_export("u", buffer, "parquet")
+    df = pd.read_parquet(io.BytesIO(buffer.getvalue()))
+    assert len(df) == 12_000
+    assert df["Probability"].dtype == "float64"
+    assert df["Age"].dtype == "int64"
+    assert df["Probability"].iloc[1] == pytest.approx(1 / 12_000)
+
+
+def test_unknown_export_format_is_rejected(store):
+    with pytest.raises(ValueError):
+        store.write_export("u", io.BytesIO(), "xlsx")
+
+
+def test_retention_purge_runs_on_writes_not_only_at_open(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.db"), retention_days=1)
+    old = (pd.Timestamp.now() - pd.Timedelta(days=3)).strftime("%Y-%m-%d %H:%M:%S")
+    store.append("u", "low", "Low Risk", 0.1, created_at=old)
+    assert store.count("u") == 1  # purged when the store opened; next purge not due yet
+    store._next_purge = 0.0
+    store.append("u", "low", "Low Risk", 0.1)
+    assert store.count("u") == 1
+    assert store.page("u")["Date"].iloc[0] != old[:16]
@@ -0,0 +1,27 @@
+import identity
+
+KEY = b"test-key"
+
+
+def test_issued_token_round_trips():
+    user_id, token = identity.issue_token(KEY)
+    assert identity.user_id_from_token(token, KEY) == user_id
+
+
+def test_forged_or_malformed_tokens_are_rejected():
+    user_id, token = identity.issue_token(KEY)
+    assert identity.user_id_from_token(token, b"other-key") is None
+    assert identity.user_id_from_token("someone-else." + token.partition(".")[2], KEY) is None
+    for token in (None, "", user_id, user_id + "."):
+        assert identity.user_id_from_token(token, KEY) is None
+
+
+def test_generated_key_is_kept(tmp_path):
+    path = str(tmp_path / "key")
+    assert identity._load_or_create_key(path) == identity._load_or_create_key(path)
+    assert len(identity._load_or_create_key(path)) == 32
+
+
+def test_account_id_is_stable_per_account():
+    assert identity.account_user_id("iss", "alice") == identity.account_user_id("iss", "alice")
+    assert identity.account_user_id("iss", "alice") != identity.account_user_id("iss", "bob")
@@ -0,0 +1,81 @@
+import os
+import warnings
+
+import joblib
+import pytest
+
+from model_registry import ModelRegistry, create_dummy_model
+
+
+@pytest.fixture
+def artifact(tmp_path):
+    path = str(tmp_path / "model.pkl")
+    joblib.dump(create_dummy_model(), path)
+    return path
+
+
+def _other_model():
+    return create_dummy_model().set_params(n_estimators=5).fit([[0] * 13, [1] * 13], [0, 1])
+
+
+def _replace(path, data):
+    # Swap the file in atomically, as a deploy would: the loaded model may be
+    # memory-mapped from the old one.
+    with open(path + ".tmp", "wb") as f:
+        f.write(data)
+    # Make sure the stat changes even on filesystems with coarse mtimes.
+    st = os.stat(path + ".tmp")
+    os.utime(path + ".tmp", ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    os.replace(path + ".tmp", path)
+
+
+def _replace_model(path, model):
+    joblib.dump(model, path + ".new")
+    with open(path + ".new", "rb") as f:
+        _replace(path, f.read())
+
+
+def test_loads_once_and_reloads_on_change(artifact):
+    registry = ModelRegistry(artifact, engine="sklearn")
+    model = registry.get()
+    assert registry.get() is model
+    version = registry.version
+
+    _replace_model(artifact, _other_model())
+    assert registry.get() is not model
+    assert registry.version != version
+
+
+def test_corrupt_replacement_keeps_serving_the_loaded_model(artifact):
+    registry = ModelRegistry(artifact, engine="sklearn")
+    model = registry.get()
+    version = registry.version
+
+    _replace(artifact, b"not a pickle")
+    with pytest.warns(UserWarning, match="keeping model version"):
+        assert registry.get() is model
+    # The failed file is remembered and not retried on every call.
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        assert registry.get() is model
+    assert registry.version == version
+
+    # Restoring the same artifact keeps the model; a different one is loaded.
+    _replace_model(artifact, create_dummy_model())
+    assert registry.get() is model
+    _replace_model(artifact, _other_model())
+    assert registry.get() is not model
+
+
+def test_corrupt_artifact_without_a_loaded_model_raises(tmp_path):
+    path = str(tmp_path / "model.pkl")
+    with open(path, "wb") as f:
+        f.write(b"not a pickle")
+    with pytest.raises(Exception):
+        ModelRegistry(path, engine="sklearn").get()
+
+
+def test_missing_artifact_falls_back_to_dummy(tmp_path):
+    registry = ModelRegistry(str(tmp_path / "missing.pkl"), engine="sklearn")
+    registry.get()
+    assert registry.version == "dummy"
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+import prediction_cache
+from prediction_cache import PredictionCache
+
+
+def _key(version, *values):
+    return PredictionCache.make_key(version, np.array([values], dtype=np.float32))
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(prediction_cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_lru_eviction_order():
+    cache = PredictionCache(maxsize=2)
+    cache.put(_key("v1", 1), "a")
+    cache.put(_key("v1", 2), "b")
+    assert cache.get(_key("v1", 1)) == "a"  # 1 is now the most recently used
+    cache.put(_key("v1", 3), "c")
+    assert cache.get(_key("v1", 2)) is None
+    assert cache.get(_key("v1", 1)) == "a"
+    assert cache.get(_key("v1", 3)) == "c"
+
+
+def test_ttl_expiry(clock):
+    cache = PredictionCache(maxsize=10, ttl=60)
+    cache.put(_key("v1", 1), "a")
+    clock[0] += 59
+    assert cache.get(_key("v1", 1)) == "a"
+    clock[0] += 2
+    assert cache.get(_key("v1", 1)) is None
+    assert cache.stats()["size"] == 0
+
+
+def test_new_model_version_drops_every_entry():
+    cache = PredictionCache(maxsize=10)
+    cache.put(_key("v1", 1), "a")
+    cache.put(_key("v1", 2), "b")
+    assert cache.get(_key("v2", 1)) is None
+    assert cache.stats()["size"] == 0
+    cache.put(_key("v2", 1), "a2")
+    assert cache.get(_key("v2", 1)) == "a2"
+
+
+def test_counters():
+    cache = PredictionCache(maxsize=1)
+    cache.get(_key("v1", 1))
+    cache.put(_key("v1", 1), "a")
+    cache.get(_key("v1", 1))
+    cache.put(_key("v1", 2), "b")
+    cache.get(_key("v1", 1))
+    assert cache.stats() == {"size": 1, "maxsize": 1, "hits": 1, "misses": 2, "evictions": 1}
+
+
+def test_disabled_cache_stores_nothing():
+    cache = PredictionCache(maxsize=0)
+    cache.put(_key("v1", 1), "a")
+    assert cache.get(_key("v1", 1)) is None
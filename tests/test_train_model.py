@@ -0,0 +1,33 @@
+from train_model import select, shortlist
+
+
+def _result(accuracy, nodes, size, latency=None, depth=6):
+    result = {"params": {"nodes": nodes}, "cv_accuracy": accuracy, "n_nodes": nodes, "max_depth": depth,
+              "size_bytes": size}
+    if latency is not None:
+        result["single_row_p50_ms"] = latency
+    return result
+
+
+def test_shortlist_keeps_accurate_candidates_near_the_smallest():
+    results = [
+        _result(0.90, 100, 10),
+        _result(0.85, 50, 5),     # too inaccurate
+        _result(0.89, 140, 14),
+        _result(0.90, 400, 40),   # too many nodes
+        _result(0.895, 120, 12),
+    ]
+    chosen = shortlist(results, tolerance=0.01, cost_tolerance=0.5, size=5)
+    assert [r["n_nodes"] for r in chosen] == [100, 120, 140]
+    assert len(shortlist(results, tolerance=0.01, cost_tolerance=0.5, size=2)) == 2
+
+
+def test_select_prefers_measured_latency_over_node_count():
+    shortlisted = [_result(0.9, 100, 10, latency=2.0), _result(0.9, 120, 12, latency=1.0)]
+    assert select(shortlisted, latency_tolerance=0.05)["n_nodes"] == 120
+
+
+def test_select_trades_a_little_latency_for_size():
+    shortlisted = [_result(0.9, 120, 30, latency=1.00), _result(0.9, 100, 10, latency=1.04),
+                   _result(0.9, 90, 5, latency=1.50)]
+    assert select(shortlisted, latency_tolerance=0.05)["size_bytes"] == 10
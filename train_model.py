@@ -0,0 +1,235 @@
+"""Train a versioned heart disease model artifact from a local dataset.
+
+    python train_model.py data/heart.csv
+    python train_model.py data/heart.parquet --install --accuracy-tolerance 0.005
+
+The dataset needs the 13 feature columns in ``features.FEATURE_ORDER`` (form
+labels or their numeric codes) and a 0/1 ``target`` column.
+
+A grid of RandomForest configurations is cross-validated in parallel on all
+cores, recording each candidate's node count, depth and pickled size; timings
+taken alongside other workers are too noisy to rank on, so none are taken
+there. Candidates within ``--accuracy-tolerance`` of the best accuracy and
+within ``--cost-tolerance`` of the fewest nodes are shortlisted and benchmarked
+one at a time. Of those, the smallest whose single-row latency is within
+``--latency-tolerance`` of the fastest is chosen.
+
+The chosen configuration is refit and scored on a held-out split, then written
+as ``models/heart_disease_model-<version>.pkl`` with a JSON sidecar. The same
+metadata is attached to the estimator as ``heartguard_metadata_``: feature
+order, risk thresholds, training hash, parameters, metrics and benchmark
+numbers. ``--install`` atomically replaces the served artifact, and the running
+app picks it up without a restart.
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import config
+from features import FEATURE_ORDER, encode_frame
+from scoring import RISK_THRESHOLDS
+
+PARAM_GRID = {
+    "n_estimators": [25, 50, 100, 200],
+    "max_depth": [4, 6, 8, 12, None],
+    "min_samples_leaf": [1, 5],
+    "max_features": ["sqrt"],
+}
+
+
+def load_dataset(path, target="target"):
+    if os.path.splitext(path)[1].lower() in (".parquet", ".pq"):
+        df = pd.read_parquet(path)
+    else:
+        df = pd.read_csv(path)
+    if target not in df.columns:
+        raise ValueError(f"Dataset has no '{target}' column")
+    return encode_frame(df), df[target].to_numpy(dtype=np.int64)
+
+
+def dataset_hash(X, y, params, seed):
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(X).tobytes())
+    digest.update(np.ascontiguousarray(y).tobytes())
+    digest.update(json.dumps({"grid": params, "seed": seed}, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def candidates(grid):
+    keys = list(grid)
+    for values in itertools.product(*(grid[k] for k in keys)):
+        yield dict(zip(keys, values))
+
+
+def model_cost(model):
+    """Deterministic cost of a fitted forest: total nodes, deepest tree and pickled size."""
+    return {
+        "n_nodes": int(sum(est.tree_.node_count for est in model.estimators_)),
+        "max_depth": int(max(est.tree_.max_depth for est in model.estimators_)),
+        "size_bytes": len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)),
+    }
+
+
+def benchmark(model, X, repeats=200):
+    """Single-row p50 latency (ms), 10k-row throughput and model_cost()."""
+    row = X[:1]
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.predict_proba(row)
+        timings.append(time.perf_counter() - start)
+    batch = X[np.arange(10_000) % len(X)]
+    start = time.perf_counter()
+    model.predict_proba(batch)
+    batch_s = time.perf_counter() - start
+    return {
+        "single_row_p50_ms": float(np.median(timings)) * 1000.0,
+        "batch_10k_rows_s": len(batch) / batch_s,
+        **model_cost(model),
+    }
+
+
+def evaluate_candidate(params, X, y, cv, seed):
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.model_selection import cross_val_score
+    model = RandomForestClassifier(random_state=seed, n_jobs=1, **params)
+    scores = cross_val_score(model, X, y, cv=cv, scoring="accuracy", n_jobs=1)
+    model.fit(X, y)
+    return {"params": params, "cv_accuracy": float(scores.mean()), "cv_std": float(scores.std()),
+            **model_cost(model)}
+
+
+def _cost_key(result):
+    return result["n_nodes"], result["max_depth"], result["size_bytes"]
+
+
+def shortlist(results, tolerance, cost_tolerance, size):
+    """Candidates worth benchmarking, cheapest first.
+
+    Those within ``tolerance`` of the best accuracy and with at most
+    ``1 + cost_tolerance`` times the fewest nodes among them, capped at ``size``.
+    """
+    best = max(r["cv_accuracy"] for r in results)
+    eligible = sorted((r for r in results if r["cv_accuracy"] >= best - tolerance), key=_cost_key)
+    max_nodes = eligible[0]["n_nodes"] * (1 + cost_tolerance)
+    return [r for r in eligible if r["n_nodes"] <= max_nodes][:size]
+
+
+def select(shortlisted, latency_tolerance):
+    """Smallest benchmarked candidate within ``latency_tolerance`` of the fastest."""
+    fastest = min(r["single_row_p50_ms"] for r in shortlisted)
+    fast = [r for r in shortlisted if r["single_row_p50_ms"] <= fastest * (1 + latency_tolerance)]
+    return min(fast, key=lambda r: (r["size_bytes"], r["single_row_p50_ms"]))
+
+
+def install(artifact_path, target_path):
+    directory = os.path.dirname(os.path.abspath(target_path))
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".pkl")
+    os.close(fd)
+    shutil.copyfile(artifact_path, tmp)
+    os.replace(tmp, target_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train and version a heart disease model.")
+    parser.add_argument("dataset", help=".csv or .parquet with the 13 features and a target column")
+    parser.add_argument("--target", default="target", help="label column (default: target)")
+    parser.add_argument("--output-dir", default=os.path.join(config.BASE_DIR, "models"))
+    parser.add_argument("--cv", type=int, default=5, help="cross-validation folds (default: 5)")
+    parser.add_argument("--test-size", type=float, default=0.2, help="held-out fraction (default: 0.2)")
+    parser.add_argument("--accuracy-tolerance", type=float, default=0.01,
+                        help="accuracy a smaller/faster model may give up vs. the best (default: 0.01)")
+    parser.add_argument("--cost-tolerance", type=float, default=0.5,
+                        help="extra nodes a shortlisted candidate may have vs. the smallest (default: 0.5)")
+    parser.add_argument("--shortlist", type=int, default=5,
+                        help="most candidates to benchmark one at a time (default: 5)")
+    parser.add_argument("--latency-tolerance", type=float, default=0.05,
+                        help="slowdown vs. the fastest shortlisted candidate traded for a smaller "
+                             "artifact (default: 0.05)")
+    parser.add_argument("--jobs", type=int, default=-1, help="parallel candidates (default: all cores)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--install", action="store_true", help="replace the served model artifact")
+    args = parser.parse_args(argv)
+
+    import joblib
+    from joblib import Parallel, delayed
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.metrics import accuracy_score, roc_auc_score
+    from sklearn.model_selection import train_test_split
+
+    X, y = load_dataset(args.dataset, args.target)
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=args.test_size, random_state=args.seed, stratify=y)
+
+    grid = list(candidates(PARAM_GRID))
+    print(f"Evaluating {len(grid)} candidates on {len(X_train)} rows...", file=sys.stderr)
+    results = Parallel(n_jobs=args.jobs)(
+        delayed(evaluate_candidate)(params, X_train, y_train, args.cv, args.seed) for params in grid)
+    # Benchmarked one at a time in this process, not alongside other CV workers.
+    shortlisted = shortlist(results, args.accuracy_tolerance, args.cost_tolerance, args.shortlist)
+    for result in shortlisted:
+        model = RandomForestClassifier(random_state=args.seed, n_jobs=1, **result["params"])
+        model.fit(X_train, y_train)
+        result.update(benchmark(model, X_train, repeats=200))
+    for result in shortlisted:
+        print(f"  {result['params']}: {result['n_nodes']} nodes, {result['size_bytes'] / 1024:.0f} KiB, "
+              f"{result['single_row_p50_ms']:.3f} ms/row", file=sys.stderr)
+    chosen = select(shortlisted, args.latency_tolerance)
+    print(f"Selected {chosen['params']} (cv accuracy {chosen['cv_accuracy']:.4f}, "
+          f"{chosen['n_nodes']} nodes, {chosen['size_bytes'] / 1024:.0f} KiB, "
+          f"{chosen['single_row_p50_ms']:.3f} ms/row)", file=sys.stderr)
+
+    model = RandomForestClassifier(random_state=args.seed, **chosen["params"])
+    model.fit(X_train, y_train)
+    proba = model.predict_proba(X_test)[:, 1]
+
+    training_hash = dataset_hash(X, y, PARAM_GRID, args.seed)
+    version = f"{time.strftime('%Y%m%d')}-{training_hash[:8]}"
+    metadata = {
+        "version": version,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "feature_order": FEATURE_ORDER,
+        "risk_thresholds": list(RISK_THRESHOLDS),
+        "training_hash": training_hash,
+        "dataset": os.path.basename(args.dataset),
+        "n_train": int(len(X_train)),
+        "n_test": int(len(X_test)),
+        "params": chosen["params"],
+        "metrics": {
+            "cv_accuracy": chosen["cv_accuracy"],
+            "test_accuracy": float(accuracy_score(y_test, proba >= 0.5)),
+            "test_roc_auc": float(roc_auc_score(y_test, proba)),
+        },
+        "benchmark": benchmark(model, X_test),
+        "search": [{k: r[k] for k in ("params", "cv_accuracy", "n_nodes", "max_depth", "size_bytes")}
+                   for r in sorted(results, key=lambda r: -r["cv_accuracy"])],
+        "shortlist": [{k: r[k] for k in ("params", "cv_accuracy", "n_nodes", "size_bytes", "single_row_p50_ms")}
+                      for r in shortlisted],
+    }
+    model.heartguard_metadata_ = metadata
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    artifact = os.path.join(args.output_dir, f"heart_disease_model-{version}.pkl")
+    joblib.dump(model, artifact)
+    with open(artifact[:-len(".pkl")] + ".json", "w", encoding="utf-8") as f:
+        json.dump(metadata, f, indent=2)
+    print(f"Wrote {artifact} (test accuracy {metadata['metrics']['test_accuracy']:.4f}, "
+          f"ROC AUC {metadata['metrics']['test_roc_auc']:.4f})", file=sys.stderr)
+
+    if args.install:
+        install(artifact, config.MODEL_PATH)
+        print(f"Installed as {config.MODEL_PATH}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()